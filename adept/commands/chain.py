@@ -1,12 +1,18 @@
 import typer
-import httpx
-import os
 import re
+import time
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
-import lancedb
-from sentence_transformers import SentenceTransformer
+from adept.core.daemon import query_daemon
+from adept.core.retrieval import IndexNotFoundError, build_context_prompt, open_retriever
+from adept.core.engine import execute_task, stream_task
+from adept.core.display import render_stream, print_cache_stats
+from adept.core.config import HISTORY_TOKEN_BUDGET, SEARCH_CONFIG, CONTEXT_CONFIG
+from adept.core.context import assemble_context
+from adept.core.history import HistoryWindow, prompt_tokens
+from adept.core.dag import ChainFileError, load_chain_file, run_dag
+from adept.core import metrics
 
 
 load_dotenv()
@@ -14,14 +20,20 @@ console = Console()
 
 app = typer.Typer(add_completion=False)
 
-from adept.commands.write import MODEL_CONFIG
-
 @app.command("execute")
 def execute_chain(
     task_list: str = typer.Argument(..., help="A numbered list of tasks to execute in sequence."),
     provider: str = typer.Option("gemini", "--provider", "-p", help="API provider to use (gemini or groq)"),
     model: str = typer.Option("default", "--model", "-m", help="Model alias to use"),
-    context: bool = typer.Option(False, "--context", "-c", help="Enable context-aware RAG for the first task only.")
+    context: bool = typer.Option(False, "--context", "-c", help="Enable context-aware RAG for the first task only."),
+    search_mode: str = typer.Option(SEARCH_CONFIG["mode"], "--search-mode", help="Retrieval for --context: auto, hybrid, vector or lexical."),
+    paths: list[str] = typer.Option(None, "--path", help="Only retrieve context from files matching this glob (repeatable)."),
+    context_budget: int = typer.Option(CONTEXT_CONFIG["token_budget"], "--context-budget", min=1, help="Approximate tokens of retrieved code added by --context."),
+    stream: bool = typer.Option(True, "--stream/--no-stream", help="Render each step's response as tokens arrive."),
+    history_budget: int = typer.Option(HISTORY_TOKEN_BUDGET, "--history-budget", help="Approximate tokens of history replayed per step; older steps are summarized."),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cached responses for identical steps."),
+    fallback: bool = typer.Option(True, "--fallback/--no-fallback", help="Fail over to other configured providers when this one keeps failing."),
+    hedge: bool = typer.Option(False, "--hedge", help="Race slow steps against the next provider at its p95 latency (disables streaming).")
 ):
     
     tasks = [task.strip() for task in re.split(r'\s*\d+\.\s*', task_list) if task.strip()]
@@ -35,94 +47,136 @@ def execute_chain(
         console.print(f"  [yellow]{i}. {task}[/yellow]")
     console.print("\n" + "="*50 + "\n")
 
-    conversation_history = []
+    window = HistoryWindow(history_budget)
+    on_event = lambda message: console.print(f"[yellow]{message}[/yellow]")
     
     for i, task in enumerate(tasks, 1):
         console.print(f"Executing Task {i}: {task}")
 
         if i == 1 and context:
             try:
-                console.print("[blue]Loading embedding model for RAG...[/blue]")
-                embedder = SentenceTransformer('all-MiniLM-L6-v2')
-                db_path = "./.adept_db"
-                if not os.path.exists(db_path):
-                    console.print(Panel("[red]Error: No index found. Please run 'adept index create' first.[/red]", title="🔥 RAG Error"))
-                    return
-                db = lancedb.connect(db_path)
-                if "codebase" not in db.table_names():
-                    console.print(Panel("[red]Error: No codebase table found in index.[/red]", title="🔥 RAG Error"))
-                    return
-                table = db.open_table("codebase")
-                console.print("[blue]Creating embedding for your task...[/blue]")
-                task_embedding = embedder.encode(task)
-                console.print("[blue]Searching for relevant context...[/blue]")
-                results = table.search(task_embedding).limit(3).to_list()
-                if results:
-                    context_parts = []
-                    for result in results:
-                        context_part = f"""--- CONTEXT FROM {result['path']} ---
-{result['text']}
---- END CONTEXT ---"""
-                        context_parts.append(context_part)
-                    context_string = "\n\n".join(context_parts)
-                    task = f"{context_string}\n\nNow, based on the above context, please address the following task:\n{task}"
-                    console.print(f"[green]Added context from {len(results)} code chunks.[/green]")
+                with metrics.span("chain.rag"):
+                    limit = CONTEXT_CONFIG["candidates"]
+                    results = query_daemon(task, limit=limit, mode=search_mode, paths=paths)
+                    if results is None:
+                        # Lazy: the model only loads if the query needs an embedding.
+                        retriever = open_retriever(lazy=True)
+                        console.print("[blue]Searching for relevant context...[/blue]")
+                        results = retriever.search(task, limit=limit, mode=search_mode, paths=paths)
+                    else:
+                        console.print("[blue]Retrieved context from the warm retrieval daemon.[/blue]")
+                with metrics.span("chain.context"):
+                    spans = assemble_context(results, context_budget)
+                if spans:
+                    task = build_context_prompt(task, spans)
+                    console.print(f"[green]Added context from {len(spans)} code spans ({len(results)} chunks retrieved, budget ~{context_budget} tokens).[/green]")
                 else:
                     console.print("[yellow]Warning: No relevant context found.[/yellow]")
+            except IndexNotFoundError as e:
+                console.print(Panel(f"[red]Error: {e}[/red]", title="🔥 RAG Error"))
+                return
             except Exception as e:
                 console.print(Panel(f"[red]Error during RAG retrieval: {str(e)}[/red]", title="🔥 RAG Error"))
                 return
 
-        prompt = "\n".join(conversation_history) + f"\n\nPrevious tasks are complete. Now, perform this task: {task}"
-
-        config = MODEL_CONFIG[provider]
-        model_name = config["models"].get(model, config["models"]["default"])
-        api_key = os.getenv(f"{provider.upper()}_API_KEY")
-
         try:
-            if provider == "gemini":
-                gemini_history = []
-                for turn in range(0, len(conversation_history), 2):
-                    gemini_history.append({"role": "user", "parts": [{"text": conversation_history[turn]}]})
-                    if turn + 1 < len(conversation_history):
-                        gemini_history.append({"role": "model", "parts": [{"text": conversation_history[turn+1]}]})
-                gemini_history.append({"role": "user", "parts": [{"text": task}]})
-                payload = {"contents": gemini_history}
-                url = config["url_template"].format(model_name=model_name)
-                headers = {"Content-Type": "application/json"}
-                params = {"key": api_key}
-
-            elif provider == "groq":
-                groq_history = []
-                for turn in range(0, len(conversation_history), 2):
-                    groq_history.append({"role": "user", "content": conversation_history[turn]})
-                    if turn + 1 < len(conversation_history):
-                        groq_history.append({"role": "assistant", "content": conversation_history[turn+1]})
-                groq_history.append({"role": "user", "content": task})
-                payload = {"messages": groq_history, "model": model_name}
-                url = config["url_template"]
-                headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-                params = None
-
-            with httpx.Client(timeout=60) as client:
-                response = client.post(url, json=payload, headers=headers, params=params)
-                response.raise_for_status()
-                result = response.json()
-
-            if provider == "gemini":
-                output = result["candidates"][0]["content"]["parts"][0]["text"]
-            elif provider == "groq":
-                output = result["choices"][0]["message"]["content"]
-            
-            console.print(f"Response for Task {i}:")
-            console.print(Panel(output, title=f"📝 {provider} Output - Step {i}"))
+            with metrics.span("chain.step"):
+                history = window.messages()
+                console.print(
+                    f"[dim]Prompt: ~{prompt_tokens(history, task)} tokens "
+                    f"({len(window.turns)} steps verbatim, {window.folded} summarized)[/dim]"
+                )
+                console.print(f"Response for Task {i}:")
+                if stream and not hedge:
+                    output = render_stream(console, stream_task(task=task, provider=provider, model=model, conversation_history=history, cache=cache, fallback=fallback, on_event=on_event), title=f"📝 {provider} Output - Step {i}")
+                else:
+                    output, _ = execute_task(task=task, provider=provider, model=model, conversation_history=history, cache=cache, fallback=fallback, hedge=hedge, on_event=on_event)
+                    console.print(Panel(output, title=f"📝 {provider} Output - Step {i}"))
             console.print("\n" + "="*50 + "\n")
 
-            conversation_history.append(task)
-            conversation_history.append(output)
+            window.add(task, output)
 
         except Exception as e:
             console.print(Panel(f"[red]Error during task {i}: {e}[/red]", title="🔥 Chain Execution Failed"))
             break
 
+    print_cache_stats(console)
     console.print("[bold green]✅ All tasks completed successfully![/bold green]")
+
+
+@app.command("run")
+def run_chain_file(
+    chain_file: str = typer.Argument(..., help="YAML or JSON chain file whose steps may declare depends_on."),
+    provider: str = typer.Option("gemini", "--provider", "-p", help="Default API provider for steps (gemini or groq)"),
+    model: str = typer.Option("default", "--model", "-m", help="Default model alias for steps"),
+    concurrency: int = typer.Option(4, "--concurrency", "-j", help="Maximum number of steps running at once."),
+    history_budget: int = typer.Option(HISTORY_TOKEN_BUDGET, "--history-budget", help="Approximate tokens of dependency output passed to each step."),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cached responses for identical steps."),
+    fallback: bool = typer.Option(True, "--fallback/--no-fallback", help="Fail over to other configured providers when this one keeps failing.")
+):
+    """
+    Runs a chain file as a dependency graph.
+
+    Steps run as soon as the steps they depend on finish, and each step sees
+    only its dependencies' outputs. Results print in file order.
+    """
+    try:
+        steps = load_chain_file(chain_file)
+    except (OSError, ChainFileError) as e:
+        console.print(Panel(f"[red]Error: {e}[/red]", title="🔥 Chain File Error"))
+        raise typer.Exit(code=1)
+
+    console.print(f"Running [bold cyan]{len(steps)}[/bold cyan] steps with up to [bold cyan]{concurrency}[/bold cyan] at a time:")
+    for step in steps:
+        after = f" [dim](after {', '.join(step['depends_on'])})[/dim]" if step["depends_on"] else ""
+        console.print(f"  [yellow]{step['id']}: {step['task']}[/yellow]{after}")
+    console.print("\n" + "="*50 + "\n")
+
+    on_event = lambda message: console.print(f"[yellow]{message}[/yellow]")
+
+    def run_step(step: dict, inputs: list) -> str:
+        window = HistoryWindow(history_budget)
+        for task, output in inputs:
+            window.add(task, output)
+        with metrics.span("chain.step"):
+            output, _ = execute_task(
+                task=step["task"],
+                provider=step.get("provider", provider),
+                model=step.get("model", model),
+                conversation_history=window.messages(),
+                cache=cache,
+                fallback=fallback,
+                on_event=on_event,
+            )
+        return output
+
+    # Steps finish in any order; print each one once every step before it in the file has settled.
+    order = [step["id"] for step in steps]
+    settled = {}
+    printed = 0
+
+    def on_complete(step_id: str, result) -> None:
+        nonlocal printed
+        settled[step_id] = result
+        while printed < len(order) and order[printed] in settled:
+            current = order[printed]
+            done = settled[current]
+            step_provider = steps[printed].get("provider", provider)
+            if done.status == "ok":
+                console.print(Panel(done.output, title=f"📝 {step_provider} Output - {current}", subtitle=f"{done.elapsed:.2f}s"))
+            else:
+                console.print(Panel(f"[red]{done.status.capitalize()}: {done.error}[/red]", title=f"🔥 {current}"))
+            printed += 1
+
+    started = time.perf_counter()
+    results = run_dag(steps, run_step, concurrency=concurrency, on_complete=on_complete)
+    wall = time.perf_counter() - started
+
+    serial = sum(result.elapsed for result in results.values())
+    console.print(f"[dim]Wall time: {wall:.2f}s · sum of step times: {serial:.2f}s[/dim]")
+    print_cache_stats(console)
+    failed = [step_id for step_id, result in results.items() if result.status != "ok"]
+    if failed:
+        console.print(f"[bold red]{len(failed)} step(s) did not complete: {', '.join(order_id for order_id in order if order_id in failed)}[/bold red]")
+        raise typer.Exit(code=1)
+    console.print("[bold green]✅ All steps completed successfully![/bold green]")
@@ -5,6 +5,8 @@ from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from adept.core.http import get_client
+from adept.core.config import GEMINI_BASE_URL, GROQ_BASE_URL
 
 load_dotenv()
 console = Console()
@@ -30,16 +32,14 @@ def models(
 
     try:
         if provider.lower() == "gemini":
-            url = "https://generativelanguage.googleapis.com/v1/models"
+            url = f"{GEMINI_BASE_URL}/v1/models"
             params = {"key": api_key}
             headers = {}
-            with httpx.Client(timeout=30) as client:
-                response = client.get(url, params=params, headers=headers)
+            response = get_client(provider.lower()).get(url, params=params, headers=headers, timeout=30)
         elif provider.lower() == "groq":
-            url = "https://api.groq.com/openai/v1/models"
+            url = f"{GROQ_BASE_URL}/openai/v1/models"
             headers = {"Authorization": f"Bearer {api_key}"}
-            with httpx.Client(timeout=30) as client:
-                response = client.get(url, headers=headers)
+            response = get_client(provider.lower()).get(url, headers=headers, timeout=30)
 
         response.raise_for_status()
         result = response.json()
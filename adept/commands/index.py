@@ -1,73 +1,124 @@
 import typer
 import os
-import pathlib
-import lancedb
-from sentence_transformers import SentenceTransformer
+import time
+import itertools
+import numpy as np
+import pyarrow as pa
 from rich.console import Console
+from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 import math
+import json
+from adept.core.config import DB_PATH, TABLE_NAME, DAEMON_SOCKET, ANN_THRESHOLD, DEFAULT_NPROBES, EMBEDDING_CONFIG
+from adept.core.manifest import load_manifest, save_manifest, is_unchanged, make_entry
+from adept.core.walker import iter_files, read_files
+from adept.core.chunking import chunk_text
+from adept.core.embeddings import BatchEncoder, load_embedder, embedding_spec, SCHEMA_METADATA_KEY
+from adept.core import metrics
 
 console = Console()
 app = typer.Typer(add_completion=False)
 
+STAGING_TABLE_NAME = "codebase_staging"
+# Bump when the row layout or chunking changes so existing indexes are rebuilt rather than mixed.
+# The embedding spec is added per run, so switching model, backend or dtype also forces a rebuild.
+INDEX_SETTINGS = {"chunker": "syntax-v1"}
+
 IGNORE_DIRS = {'.git', '__pycache__', '.venv', '.adept_db', '.DS_Store', 'node_modules', 'venv', 'env'}
 IGNORE_EXTENSIONS = {'.pyc', '.pyo', '.pyd', '.so', '.dll', '.exe', '.bin', '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.ico', '.mp3', '.mp4', '.avi', '.mov', '.wav', '.flac', '.zip', '.tar', '.gz', '.rar', '.7z'}
 
-def should_ignore_path(path: pathlib.Path) -> bool:
-    
-    for part in path.parts:
-        if part in IGNORE_DIRS:
-            return True
+def _to_record_batch(rows: list, embeddings: np.ndarray, spec: dict) -> pa.RecordBatch:
+    vectors = pa.FixedSizeListArray.from_arrays(pa.array(embeddings.reshape(-1)), embeddings.shape[1])
+    batch = pa.RecordBatch.from_arrays(
+        [pa.array([row[name] for row in rows], type=pa.string()) for name in ("id", "text", "path")]
+        + [pa.array([row[name] for row in rows], type=pa.int32()) for name in ("start_line", "end_line")]
+        + [vectors],
+        names=["id", "text", "path", "start_line", "end_line", "vector"]
+    )
+    # The table keeps the schema of its first batch, so queries can load the same embedder.
+    return batch.replace_schema_metadata({SCHEMA_METADATA_KEY: json.dumps(spec)})
 
-    if path.suffix.lower() in IGNORE_EXTENSIONS:
-        return True
+def _ensure_vector_index(table, threshold: int, partitions: int, sub_vectors: int, changed: bool) -> bool:
+    """
+    Builds an IVF-PQ index once the table is large enough, or folds new rows into an existing one.
+    Returns True if it optimized the table, which also updates the full-text index.
+    """
+    has_index = any("vector" in index.columns for index in table.list_indices())
+    retune = bool(partitions or sub_vectors)
+    if has_index and not retune:
+        if changed:
+            console.print("[blue]Updating vector index with new chunks...[/blue]")
+            table.optimize()
+        return changed
 
-    return False
+    rows = table.count_rows()
+    if rows < threshold:
+        return False
 
-def chunk_text(text: str, chunk_size: int = 500, overlap: int = 100) -> list:
-    
-    if len(text) <= chunk_size:
-        return [text]
+    dim = table.schema.field("vector").type.list_size
+    partitions = partitions or max(1, int(math.sqrt(rows)))
+    sub_vectors = sub_vectors or next(s for s in range(max(1, dim // 8), 0, -1) if dim % s == 0)
+    console.print(f"[blue]Building IVF-PQ vector index ({partitions} partitions, {sub_vectors} sub-vectors) over {rows} chunks...[/blue]")
+    table.create_index(metric="l2", num_partitions=partitions, num_sub_vectors=sub_vectors, vector_column_name="vector", replace=True)
+    return False
 
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = min(start + chunk_size, len(text))
-        chunks.append(text[start:end])
-        start += chunk_size - overlap
-        if end == len(text):
-            break
+def _ensure_fts_index(table, changed: bool) -> None:
+    """Builds the BM25 full-text index over chunk text, or folds new rows into an existing one."""
+    from adept.core.retrieval import has_fts_index
+    if has_fts_index(table):
+        if changed:
+            table.optimize()
+        return
+    from lancedb.index import FTS
+    console.print("[blue]Building full-text index...[/blue]")
+    # Code is not prose: keep stop words ("if", "for", "not") and exact word forms searchable.
+    table.create_index("text", config=FTS(stem=False, remove_stop_words=False), replace=True)
 
-    return chunks
+def _sql_in(paths: list) -> str:
+    quoted = ", ".join("'" + p.replace("'", "''") + "'" for p in paths)
+    return f"path IN ({quoted})"
 
 @app.command("create")
-def create_index():
+def create_index(
+    full: bool = typer.Option(False, "--full", help="Ignore the manifest and rebuild the whole index."),
+    batch_size: int = typer.Option(128, "--batch-size", "-b", min=1, help="Number of chunks per embedding batch."),
+    workers: int = typer.Option(1, "--workers", "-w", min=0, help="Encoder worker processes (0 = one per CPU core)."),
+    read_workers: int = typer.Option(8, "--read-workers", min=1, help="Threads used to read and hash files."),
+    gitignore: bool = typer.Option(True, "--gitignore/--no-gitignore", help="Skip files matched by .gitignore rules."),
+    ann_threshold: int = typer.Option(ANN_THRESHOLD, "--ann-threshold", help="Build an IVF-PQ vector index once the table has this many chunks."),
+    partitions: int = typer.Option(0, "--partitions", min=0, help="IVF partitions for the vector index (0 = sqrt of row count)."),
+    sub_vectors: int = typer.Option(0, "--sub-vectors", min=0, help="PQ sub-vectors for the vector index (0 = dimension / 8)."),
+    model: str = typer.Option(EMBEDDING_CONFIG["model"], "--model", help="Sentence-transformers model used for embeddings."),
+    backend: str = typer.Option(EMBEDDING_CONFIG["backend"], "--backend", help="Embedding backend: torch, onnx or onnx-int8."),
+    vector_dtype: str = typer.Option(EMBEDDING_CONFIG["vector_dtype"], "--vector-dtype", help="Stored vector precision: float32 or float16 (half the size).")
+):
     
-    console.print("[blue]Loading sentence transformer model...[/blue]")
     try:
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-    except Exception as e:
-        console.print(f"[red]Error loading sentence transformer model: {e}[/red]")
+        spec = embedding_spec(model, backend, vector_dtype)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
         return
+    settings = {**INDEX_SETTINGS, "embedding": spec}
 
     console.print("[blue]Initializing LanceDB...[/blue]")
     try:
-        db_path = "./.adept_db"
-        db = lancedb.connect(db_path)
+        import lancedb
+        db = lancedb.connect(DB_PATH)
     except Exception as e:
         console.print(f"[red]Error connecting to LanceDB: {e}[/red]")
         return
 
+    manifest = {} if full else load_manifest(DB_PATH, settings)
+    incremental = bool(manifest) and TABLE_NAME in db.table_names()
+    if not incremental:
+        manifest = {}
+
     console.print("[blue]Scanning directory for files...[/blue]")
     try:
-        current_dir = pathlib.Path(".")
-        files = []
-
-        for file_path in current_dir.rglob("*"):
-            if file_path.is_file() and not should_ignore_path(file_path):
-                files.append(file_path)
+        with metrics.span("index.scan"):
+            files = list(iter_files(".", IGNORE_DIRS, IGNORE_EXTENSIONS, use_gitignore=gitignore))
 
-        if not files:
+        if not files and not manifest:
             console.print("[yellow]No files found to index.[/yellow]")
             return
 
@@ -76,53 +127,243 @@ def create_index():
         console.print(f"[red]Error scanning directory: {e}[/red]")
         return
 
-    data_to_insert = []
+    new_manifest = {}
+    candidates = []
+    for file_path in files:
+        key = str(file_path)
+        try:
+            stat = file_path.stat()
+        except OSError:
+            continue
+        if is_unchanged(manifest.get(key), stat):
+            new_manifest[key] = manifest[key]
+        else:
+            candidates.append((file_path, stat))
 
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TaskProgressColumn(),
-        console=console
-    ) as progress:
-        file_task = progress.add_task("[cyan]Processing files...", total=len(files))
+    candidate_keys = {str(file_path) for file_path, _ in candidates}
+    deleted_paths = [path for path in manifest if path not in new_manifest and path not in candidate_keys]
+    if incremental:
+        console.print(f"[green]{len(candidates)} new or modified, {len(deleted_paths)} deleted, {len(new_manifest)} unchanged.[/green]")
+
+    encoder = None
+    changed_paths = []
+    indexed = 0
+    started = time.perf_counter()
 
-        for file_path in files:
+    def flush(pending: list) -> pa.RecordBatch:
+        nonlocal indexed
+        embeddings = np.asarray(encoder.encode([row["text"] for row in pending]), dtype=spec["vector_dtype"])
+        indexed += len(pending)
+        rate = indexed / max(time.perf_counter() - started, 1e-9)
+        progress.update(file_task, rate=f"{rate:,.0f} chunks/s")
+        return _to_record_batch(pending, embeddings, spec)
+
+    def embed_batches():
+        """Yields one Arrow record batch per embedding flush, so only one batch is ever held in memory."""
+        nonlocal encoder, started
+        pending = []
+        for file_path, stat, raw, content_hash, error in read_files(candidates, workers=read_workers, max_pending=read_workers * 8):
+            key = str(file_path)
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
+                if error is not None:
+                    raise error
 
-                if not content.strip():
+                previous = manifest.get(key)
+                new_manifest[key] = make_entry(stat, content_hash)
+                if previous and previous["hash"] == content_hash:
                     progress.advance(file_task)
                     continue
 
-                chunks = chunk_text(content)
+                if previous:
+                    changed_paths.append(key)
 
-                embeddings = model.encode(chunks)
+                content = raw.decode('utf-8', errors='ignore')
+                if not content.strip():
+                    progress.advance(file_task)
+                    continue
+
+                if encoder is None:
+                    progress.console.print(f"[blue]Loading sentence transformer model ({spec['model']}, {spec['backend']})...[/blue]")
+                    encoder = BatchEncoder(load_embedder(spec), batch_size=batch_size, workers=workers)
+                    started = time.perf_counter()
 
-                for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-                    data_to_insert.append({
+                with metrics.span("index.chunk"):
+                    chunks = chunk_text(content, key, encoder.max_tokens, encoder.count_tokens)
+                for i, chunk in enumerate(chunks):
+                    pending.append({
                         "id": f"{file_path}#{i}",
-                        "text": chunk,
-                        "path": str(file_path),
-                        "vector": embedding
+                        "path": key,
+                        **chunk
                     })
 
                 progress.advance(file_task)
             except Exception as e:
-                console.print(f"[yellow]Warning: Could not process {file_path}: {e}[/yellow]")
+                previous = manifest.get(key)
+                if previous:
+                    # Keep the old rows and their entry, so the file is retried next run and its rows
+                    # are still cleaned up if it is deleted. A cleared mtime forces the retry.
+                    new_manifest[key] = {**previous, "mtime": None}
+                    if changed_paths and changed_paths[-1] == key:
+                        changed_paths.pop()
+                else:
+                    new_manifest.pop(key, None)
+                progress.console.print(f"[yellow]Warning: Could not process {file_path}: {e}[/yellow]")
                 progress.advance(file_task)
                 continue
 
-    console.print("[blue]Creating database table...[/blue]")
+            if len(pending) >= encoder.flush_size:
+                yield flush(pending)
+                pending = []
+
+        if pending:
+            yield flush(pending)
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(),
+        TextColumn("{task.fields[rate]}"),
+        console=console
+    ) as progress:
+        file_task = progress.add_task("[cyan]Processing files...", total=len(candidates), rate="")
+
+        try:
+            batches = embed_batches()
+            # Pull the first batch eagerly: it loads the model (surfacing load errors cleanly)
+            # and tells us the vector width needed for the table schema.
+            first = next(batches, None)
+
+            if first is None:
+                if not incremental:
+                    console.print("[yellow]No content found to index.[/yellow]")
+                    return
+                stale_paths = changed_paths + deleted_paths
+                if stale_paths:
+                    db.open_table(TABLE_NAME).delete(_sql_in(stale_paths))
+                summary = f"Re-indexed 0 chunks, removed chunks for {len(stale_paths)} files."
+            elif incremental:
+                # Stage the new rows, then upsert them and drop stale rows in a single commit,
+                # so readers never observe a half-updated table.
+                # index.write spans stream the remaining batches, so they include index.embed time.
+                with metrics.span("index.write"):
+                    staging = db.create_table(STAGING_TABLE_NAME, data=itertools.chain([first], batches), schema=first.schema, mode="overwrite")
+                stale_paths = changed_paths + deleted_paths
+                merge = db.open_table(TABLE_NAME).merge_insert("id").when_matched_update_all().when_not_matched_insert_all()
+                if stale_paths:
+                    merge = merge.when_not_matched_by_source_delete(_sql_in(stale_paths))
+                with metrics.span("index.merge"):
+                    merge.execute(staging.search().limit(None).to_batches())
+                db.drop_table(STAGING_TABLE_NAME)
+                summary = f"Re-indexed {indexed} chunks, removed chunks for {len(stale_paths)} files."
+            else:
+                # Lance commits an overwrite as a new table version only once the stream is
+                # fully written, so a crash mid-build leaves the previous index readable.
+                with metrics.span("index.write"):
+                    db.create_table(TABLE_NAME, data=itertools.chain([first], batches), schema=first.schema, mode="overwrite")
+                summary = f"Successfully indexed {indexed} chunks into database."
+        except Exception as e:
+            console.print(f"[red]Error building index: {e}[/red]")
+            return
+        finally:
+            if encoder is not None:
+                encoder.close()
+
+    console.print(f"[green]{summary}[/green]")
+    table = db.open_table(TABLE_NAME)
+    changed = bool(indexed or changed_paths or deleted_paths)
     try:
-        if "codebase" in db.table_names():
-            db.drop_table("codebase")
+        with metrics.span("index.ann"):
+            changed = changed and not _ensure_vector_index(table, ann_threshold, partitions, sub_vectors, changed)
+    except Exception as e:
+        console.print(f"[yellow]Warning: Could not build vector index, searches will scan every chunk: {e}[/yellow]")
+    try:
+        with metrics.span("index.fts"):
+            _ensure_fts_index(table, changed)
+    except Exception as e:
+        console.print(f"[yellow]Warning: Could not build full-text index, searches will use vectors only: {e}[/yellow]")
+    save_manifest(DB_PATH, new_manifest, settings)
+    console.print("[bold green]✅ Indexing completed successfully![/bold green]")
 
-        table = db.create_table("codebase", data=data_to_insert, mode="overwrite")
-        console.print(f"[green]Successfully indexed {len(data_to_insert)} chunks into database.[/green]")
+@app.command("serve")
+def serve_index():
+    """Runs a local retrieval daemon that keeps the embedding model and index warm."""
+    console.print("[blue]Loading embedding model and index...[/blue]")
+    try:
+        from adept.core.daemon import serve
+        serve(on_ready=lambda: console.print(f"[green]Retrieval daemon listening on {DAEMON_SOCKET}. Press Ctrl+C to stop.[/green]"))
+    except KeyboardInterrupt:
+        console.print("[yellow]Retrieval daemon stopped.[/yellow]")
+    except Exception as e:
+        console.print(f"[red]Error running retrieval daemon: {e}[/red]")
+
+@app.command("query")
+def query_index(
+    queries: list[str] = typer.Argument(..., help="One or more queries to run against the index."),
+    limit: int = typer.Option(5, "--limit", "-k", min=1, help="Number of chunks to return per query."),
+    nprobes: int = typer.Option(DEFAULT_NPROBES, "--nprobes", min=1, help="IVF partitions to probe (higher = better recall, slower)."),
+    recall: bool = typer.Option(False, "--recall", help="Also run an exact search and report recall@k of the ANN results."),
+    mode: str = typer.Option("vector", "--mode", "-m", help="Search mode: vector, lexical, hybrid or auto."),
+    paths: list[str] = typer.Option(None, "--path", help="Only search files matching this glob (repeatable), e.g. 'adept/core/*.py'.")
+):
+    """Runs retrieval alone (no LLM call) and reports per-query latency."""
+    console.print("[blue]Loading embedding model and index...[/blue]")
+    try:
+        from adept.core.retrieval import open_retriever, resolve_mode
+        retriever = open_retriever()
     except Exception as e:
-        console.print(f"[red]Error creating database table: {e}[/red]")
+        console.print(f"[red]Error opening index: {e}[/red]")
+        return
+
+    if mode != "vector" or paths:
+        if recall:
+            console.print("[yellow]--recall only applies to plain vector search; ignoring it.[/yellow]")
+        for query in queries:
+            try:
+                resolved = resolve_mode(query, mode, retriever.lexical)
+                started = time.perf_counter()
+                results = retriever.search(query, limit, nprobes, mode=mode, paths=paths)
+            except Exception as e:
+                console.print(f"[red]Error searching for '{query}': {e}[/red]")
+                return
+            _print_results(query, results, f"{resolved} · {(time.perf_counter() - started) * 1000:.1f} ms")
         return
 
-    console.print("[bold green]✅ Indexing completed successfully![/bold green]")
\ No newline at end of file
+    recalls = []
+    for query in queries:
+        started = time.perf_counter()
+        vector = retriever.embed(query)
+        embedded = time.perf_counter()
+        results = retriever.search_vector(vector, limit, nprobes)
+        searched = time.perf_counter()
+
+        caption = f"embed {(embedded - started) * 1000:.1f} ms · search {(searched - embedded) * 1000:.1f} ms"
+        if recall:
+            exact_ids = {result["id"] for result in retriever.search_vector(vector, limit, exact=True)}
+            if exact_ids:
+                recalls.append(len(exact_ids & {result["id"] for result in results}) / len(exact_ids))
+                caption += f" · recall@{limit} {recalls[-1]:.2f}"
+
+        _print_results(query, results, caption)
+
+    if recalls:
+        console.print(f"[green]Mean recall@{limit}: {sum(recalls) / len(recalls):.3f} over {len(recalls)} queries.[/green]")
+
+def _print_results(query: str, results: list, caption: str) -> None:
+    # Fused rows carry a relevance score, BM25 rows a `_score`, vector rows a `_distance`.
+    if results and "_relevance_score" in results[0]:
+        column, key = "Relevance", "_relevance_score"
+    elif results and "_score" in results[0]:
+        column, key = "BM25", "_score"
+    else:
+        column, key = "Distance", "_distance"
+    table = Table(title=f"🔎 {query}", caption=caption)
+    table.add_column("#", justify="right")
+    table.add_column("Location", style="cyan")
+    table.add_column(column, justify="right")
+    for rank, result in enumerate(results, 1):
+        location = result["path"]
+        if result.get("start_line"):
+            location += f":{result['start_line']}-{result['end_line']}"
+        table.add_row(str(rank), location, f"{result.get(key, 0.0):.4f}")
+    console.print(table)
@@ -1,7 +1,15 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import typer
 from rich.console import Console
 from rich.panel import Panel
-from adept.core.engine import run_write_task
+from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+from adept.core.engine import execute_task, stream_task, usage_tokens
+from adept.core.chunking import estimate_tokens
+from adept.core.ratelimit import get_rate_limiter
+from adept.core.display import render_stream, print_cache_stats
 from adept.commands.config import MODEL_CONFIG
 
 console = Console()
@@ -11,7 +19,11 @@ app = typer.Typer(add_completion=False)
 def execute_command(
     task: str = typer.Argument(..., help="Your coding/task request"),
     provider: str = typer.Option("groq", "--provider", "-p", help="API provider to use"),
-    model: str = typer.Option("default", "--model", "-m", help="Model alias to use")
+    model: str = typer.Option("default", "--model", "-m", help="Model alias to use"),
+    stream: bool = typer.Option(True, "--stream/--no-stream", help="Render the response as tokens arrive."),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cached responses for identical requests."),
+    fallback: bool = typer.Option(True, "--fallback/--no-fallback", help="Fail over to other configured providers when this one keeps failing."),
+    hedge: bool = typer.Option(False, "--hedge", help="Race a slow request against the next provider at its p95 latency (disables streaming).")
 ):
     """Executes an AI task using the core engine."""
     
@@ -19,8 +31,155 @@ def execute_command(
     console.print(Panel(f"Using [bold]{provider}:{model_full_name}[/bold] (alias: '{model}')", title="✅ Model Selected"))
     
     try:
-        output = run_write_task(task=task, provider=provider, model=model)
-        console.print("\n[bold green]AI Response:[/bold green]")
-        console.print(Panel(output, title=f"📝 {provider} Output"))
+        on_event = lambda message: console.print(f"[yellow]{message}[/yellow]")
+        if stream and not hedge:
+            console.print("\n[bold green]AI Response:[/bold green]")
+            render_stream(console, stream_task(task=task, provider=provider, model=model, cache=cache, fallback=fallback, on_event=on_event), title=f"📝 {provider} Output")
+        else:
+            output, _ = execute_task(task=task, provider=provider, model=model, cache=cache, fallback=fallback, hedge=hedge, on_event=on_event)
+            console.print("\n[bold green]AI Response:[/bold green]")
+            console.print(Panel(output, title=f"📝 {provider} Output"))
+        print_cache_stats(console)
     except Exception as e:
         console.print(Panel(f"[red]Error: {str(e)}[/red]", title="🔥 Execution Failed"))
+
+
+# Completion tokens reserved per request before the provider reports real usage.
+COMPLETION_TOKEN_ESTIMATE = 512
+
+
+def load_batch(path: str) -> list:
+    """
+    Reads tasks from JSONL: one {"task", optional "id", "provider", "model"} object
+    (or a bare task string) per line. Raises ValueError naming the first bad line.
+    """
+    jobs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"line {line_number}: invalid JSON ({e.msg})")
+            if isinstance(job, str):
+                job = {"task": job}
+            if not isinstance(job, dict) or not isinstance(job.get("task"), str) or not job["task"].strip():
+                raise ValueError(f"line {line_number}: expected a task string or an object with a non-empty \"task\" string")
+            for field in ("provider", "model"):
+                if field in job and not isinstance(job[field], str):
+                    raise ValueError(f"line {line_number}: \"{field}\" must be a string")
+            job["id"] = str(job.get("id", line_number))
+            jobs.append(job)
+    return jobs
+
+
+def completed_ids(path: str) -> set:
+    """Ids already answered successfully in an existing output file, so a rerun resumes."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A line cut short by an interrupted run.
+            if record.get("status") == "success":
+                done.add(str(record["id"]))
+    return done
+
+
+@app.command("batch")
+def batch_command(
+    input_file: str = typer.Argument(..., help="JSONL file of tasks: {\"task\": ..., \"id\"?, \"provider\"?, \"model\"?} per line"),
+    output: str = typer.Option(None, "--output", "-o", help="Results JSONL (default: <input>.results.jsonl). Existing successes are skipped."),
+    provider: str = typer.Option("groq", "--provider", "-p", help="Default API provider for tasks"),
+    model: str = typer.Option("default", "--model", "-m", help="Default model alias for tasks"),
+    concurrency: int = typer.Option(8, "--concurrency", "-j", help="Maximum requests in flight."),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cached responses for identical requests.")
+):
+    """
+    Runs many tasks concurrently, paced to each provider's rate limits.
+
+    Requests wait on per-provider requests/min and tokens/min buckets, which are
+    corrected from rate-limit headers and reported usage. Results are appended
+    as they complete, so an interrupted run picks up where it stopped.
+    """
+    output = output or f"{os.path.splitext(input_file)[0]}.results.jsonl"
+    try:
+        jobs = load_batch(input_file)
+    except (OSError, ValueError) as e:
+        console.print(Panel(f"[red]Error: Could not read {input_file}: {e}[/red]", title="🔥 Batch Error"))
+        raise typer.Exit(code=1)
+
+    done = completed_ids(output)
+    pending = [job for job in jobs if job["id"] not in done]
+    console.print(Panel(
+        f"{len(jobs)} tasks · {len(jobs) - len(pending)} already done · writing to [bold]{output}[/bold]",
+        title="📦 Batch"
+    ))
+    if not pending:
+        return
+
+    def run_job(job: dict) -> dict:
+        job_provider = job.get("provider", provider)
+        limiter = get_rate_limiter(job_provider)
+        estimate = estimate_tokens(job["task"]) + COMPLETION_TOKEN_ESTIMATE
+        usage = {}
+
+        def on_response(request, response, result):
+            if result is None:
+                # A rejected or failed attempt used no tokens; its headers still update the quota.
+                limiter.observe(response.headers, estimate, 0, response.status_code)
+                return
+            usage["tokens"] = usage_tokens(request["provider"], result)
+            limiter.observe(response.headers, estimate, usage["tokens"], response.status_code)
+
+        started = time.perf_counter()
+        try:
+            # Quota is taken for every attempt that really goes out (retries too), never for cache hits.
+            # No failover: another provider's quota is not covered by this provider's limiter.
+            text, _ = execute_task(
+                job["task"], job_provider, job.get("model", model), cache=cache,
+                on_response=on_response, before_send=lambda request: limiter.acquire(estimate),
+            )
+        except Exception as e:
+            return {"id": job["id"], "status": "error", "provider": job_provider, "error": str(e)}
+        return {
+            "id": job["id"],
+            "status": "success",
+            "provider": job_provider,
+            "response": text,
+            "tokens": usage.get("tokens"),
+            "elapsed": round(time.perf_counter() - started, 3),
+        }
+
+    finished = 0
+    failures = 0
+    tokens = 0
+    started = time.perf_counter()
+    with open(output, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool, Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(),
+        TextColumn("{task.fields[rate]}"),
+        console=console,
+    ) as progress:
+        batch_task = progress.add_task("[cyan]Running tasks...", total=len(pending), rate="")
+        for future in as_completed([pool.submit(run_job, job) for job in pending]):
+            record = future.result()
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            finished += 1
+            failures += record["status"] != "success"
+            tokens += record.get("tokens") or 0
+            minutes = (time.perf_counter() - started) / 60
+            progress.update(batch_task, advance=1, rate=f"{finished / minutes:,.0f} req/min · {tokens / minutes:,.0f} tok/min")
+
+    summary = f"Completed {len(pending) - failures} of {len(pending)} tasks in {time.perf_counter() - started:.1f}s."
+    if failures:
+        summary += f" [red]{failures} failed[/red]; rerun the same command to retry them."
+    console.print(Panel(summary, title="✅ Batch Complete" if not failures else "⚠️ Batch Incomplete"))
+    print_cache_stats(console)
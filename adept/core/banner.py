@@ -1,10 +1,6 @@
-from rich.console import Console
-from rich.text import Text
+import sys
 
-def print_banner() -> None:
-    """Prints a gradient ASCII art banner for the application."""
-    console = Console()
-    art = r"""
+ART = r"""
  █████╗ ██████╗ ███████╗██████╗ ████████╗
 ██╔══██╗██╔══██╗██╔════╝██╔══██╗╚══██╔══╝
 ███████║██║  ██║█████╗  ██████╔╝   ██║   
@@ -12,12 +8,22 @@ def print_banner() -> None:
 ██║  ██║██████╔╝███████╗██║        ██║   
 ╚═╝  ╚═╝╚═════╝ ╚══════╝╚═╝        ╚═╝   
     """
-    
+
+def print_banner() -> None:
+    """Prints a gradient ASCII art banner for the application."""
+    # Only decorate interactive terminals; scripts and CI logs skip the Rich import entirely.
+    if not sys.stdout.isatty():
+        return
+
+    from rich.console import Console
+    from rich.text import Text
+
+    console = Console()
+
     # Create a Text object with gradient colors
-    styled_art = Text(art)
-    styled_art.stylize("bold cyan", 0, len(art))
+    styled_art = Text(ART)
+    styled_art.stylize("bold cyan", 0, len(ART))
     
     # Print the styled text, centered in the terminal
     console.print(styled_art, justify="center")
     console.print() # Add a blank line for spacing
-
@@ -0,0 +1,73 @@
+import asyncio
+from adept.core.config import DEFAULT_NPROBES, SEARCH_BATCH_CONFIG
+
+
+class SearchBatcher:
+    """
+    Coalesces concurrent searches into one batched encode and vector search.
+
+    Queries that arrive within max_wait of each other (up to max_batch) are
+    embedded with a single model call and searched with one multi-vector
+    query, off the event loop. Requests that arrive while a batch is running
+    queue up and form the next batch, so batches grow with load.
+    """
+
+    def __init__(self, retriever, max_batch: int = SEARCH_BATCH_CONFIG["max_batch"], max_wait: float = SEARCH_BATCH_CONFIG["max_wait_ms"] / 1000):
+        self.retriever = retriever
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = None
+        self._worker = None
+
+    async def search(self, query: str, limit: int = 3, nprobes: int = DEFAULT_NPROBES) -> list:
+        if self._worker is None:
+            # Created lazily so the queue and worker belong to the running event loop.
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query, limit, nprobes, future))
+        return await future
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            if self._queue.empty():
+                await asyncio.sleep(self.max_wait)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch: list) -> None:
+        try:
+            results = await asyncio.to_thread(self._search_batch, batch)
+        except Exception as e:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (*_, future), rows in zip(batch, results):
+            if not future.done():
+                future.set_result(rows)
+
+    def _search_batch(self, batch: list) -> list:
+        vectors = self.retriever.embed_many([query for query, *_ in batch])
+        results = [None] * len(batch)
+        # One search per distinct nprobes value (normally just one), at the largest requested limit.
+        groups = {}
+        for i, (_, limit, nprobes, _) in enumerate(batch):
+            groups.setdefault(nprobes, []).append(i)
+        for nprobes, indices in groups.items():
+            limit = max(batch[i][1] for i in indices)
+            grouped = self.retriever.search_vectors(vectors[indices], limit, nprobes)
+            for i, rows in zip(indices, grouped):
+                results[i] = rows[:batch[i][1]]
+        return results
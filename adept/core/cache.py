@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from adept.core.config import CACHE_CONFIG
+
+
+def cache_key(request: dict) -> str:
+    """Content address of a prepared request: provider, resolved model and normalized payload."""
+    payload = {k: v for k, v in request["payload"].items() if k != "stream"}
+    # Streaming and non-streaming calls for the same conversation share an entry.
+    material = json.dumps(
+        {"provider": request["provider"], "model": request["model_name"], "payload": payload},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of reply texts keyed by cache_key.
+
+    Entries expire after ttl_seconds, and the least recently used ones are
+    evicted once there are more than max_entries. hits and misses count lookups
+    made by this process.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+            """
+        )
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock, self._db:
+            row = self._db.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self._db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def close(self) -> None:
+        self._db.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache | None:
+    """Returns the process-wide response cache, or None when it is disabled (ADEPT_CACHE=0)."""
+    global _cache
+    if not CACHE_CONFIG["enabled"]:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(CACHE_CONFIG["path"], CACHE_CONFIG["ttl_seconds"], CACHE_CONFIG["max_entries"])
+        return _cache
+
+
+def current_cache() -> ResponseCache | None:
+    """The process-wide cache if this run already opened it; never creates the database."""
+    return _cache
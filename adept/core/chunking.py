@@ -0,0 +1,123 @@
+import ast
+from typing import Callable
+
+DEFAULT_MAX_TOKENS = 256
+PYTHON_SUFFIXES = (".py", ".pyi")
+BLOCK_CLOSERS = {"}", "};", "end", "fi", "done", "esac"}
+DEFINITION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for when no tokenizer is available (~4 characters per token for code)."""
+    return max(1, len(text) // 4)
+
+
+def chunk_text(text: str, path: str = "", max_tokens: int = DEFAULT_MAX_TOKENS, count_tokens: Callable[[str], int] = estimate_tokens) -> list:
+    """
+    Splits a file into non-overlapping chunks along its structure.
+
+    Python files are split on AST function/class boundaries; other files on
+    top-level blocks separated by blank lines. Neighbouring blocks are packed
+    together up to max_tokens, and blocks that are still too large fall back to
+    line windows. Returns dicts with text, start_line and end_line (1-based, inclusive).
+    """
+    lines = text.splitlines(keepends=True)
+    if not lines:
+        return []
+
+    def fits(start: int, end: int) -> bool:
+        return count_tokens("".join(lines[start:end])) <= max_tokens
+
+    segments = None
+    if path.endswith(PYTHON_SUFFIXES):
+        try:
+            tree = ast.parse(text)
+            segments = _python_segments(tree.body, 0, len(lines), fits)
+        except (SyntaxError, ValueError):
+            segments = None
+    if segments is None:
+        segments = _heuristic_segments(lines)
+
+    return _pack(lines, segments, max_tokens, count_tokens)
+
+
+def _node_start(node: ast.stmt) -> int:
+    return min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])]) - 1
+
+
+def _python_segments(nodes: list, start: int, end: int, fits: Callable[[int, int], bool]) -> list:
+    """Splits lines [start, end) at statement boundaries, descending into definitions that don't fit."""
+    if not nodes:
+        return [(start, end)]
+
+    # The first statement absorbs any leading lines (module docstring, def header, comments).
+    starts = [start] + [_node_start(node) for node in nodes[1:]]
+    ends = starts[1:] + [end]
+    segments = []
+    for node, seg_start, seg_end in zip(nodes, starts, ends):
+        if isinstance(node, DEFINITION_NODES) and len(node.body) > 1 and not fits(seg_start, seg_end):
+            segments.extend(_python_segments(node.body, seg_start, seg_end, fits))
+        else:
+            segments.append((seg_start, seg_end))
+    return segments
+
+
+def _heuristic_segments(lines: list) -> list:
+    """Splits at unindented lines that follow a blank line or a block closer such as '}'."""
+    boundaries = [0]
+    for i in range(1, len(lines)):
+        line = lines[i]
+        if not line.strip() or line[0] in " \t":
+            continue
+        previous = lines[i - 1].strip()
+        if not previous or previous in BLOCK_CLOSERS:
+            boundaries.append(i)
+    return list(zip(boundaries, boundaries[1:] + [len(lines)]))
+
+
+def _line_windows(lines: list, start: int, end: int, max_tokens: int, count_tokens: Callable[[str], int]) -> list:
+    windows = []
+    window_start = start
+    tokens = 0
+    for i in range(start, end):
+        line_tokens = count_tokens(lines[i])
+        if tokens and tokens + line_tokens > max_tokens:
+            windows.append((window_start, i))
+            window_start = i
+            tokens = 0
+        tokens += line_tokens
+    windows.append((window_start, end))
+    return windows
+
+
+def _pack(lines: list, segments: list, max_tokens: int, count_tokens: Callable[[str], int]) -> list:
+    chunks = []
+
+    def emit(start: int, end: int) -> None:
+        text = "".join(lines[start:end])
+        if text.strip():
+            chunks.append({"text": text, "start_line": start + 1, "end_line": end})
+
+    current = None
+    current_tokens = 0
+    for start, end in segments:
+        tokens = count_tokens("".join(lines[start:end]))
+        if tokens > max_tokens:
+            if current:
+                emit(*current)
+                current = None
+            for window in _line_windows(lines, start, end, max_tokens, count_tokens):
+                emit(*window)
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            emit(*current)
+            current = None
+        if current:
+            current = (current[0], end)
+            current_tokens += tokens
+        else:
+            current = (start, end)
+            current_tokens = tokens
+    if current:
+        emit(*current)
+    return chunks
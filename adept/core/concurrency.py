@@ -0,0 +1,55 @@
+import asyncio
+from contextlib import asynccontextmanager
+from adept.core.config import CONCURRENCY_CONFIG
+
+
+class ProviderBusyError(Exception):
+    """Raised when a provider's concurrency limit is saturated; status_code is 429 or 503."""
+
+    def __init__(self, provider: str, status_code: int, message: str):
+        super().__init__(message)
+        self.provider = provider
+        self.status_code = status_code
+
+
+class ProviderLimiter:
+    """Caps in-flight requests for one provider and bounds how many may wait for a slot."""
+
+    def __init__(self, provider: str, max_concurrency: int, max_waiting: int, wait_timeout: float):
+        self.provider = provider
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if not self._semaphore.locked():
+            # A slot is free, so this returns without suspending.
+            await self._semaphore.acquire()
+        else:
+            if self._waiting >= self.max_waiting:
+                raise ProviderBusyError(self.provider, 429, f"Too many pending requests for '{self.provider}'. Retry later.")
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.wait_timeout)
+            except asyncio.TimeoutError:
+                raise ProviderBusyError(self.provider, 503, f"'{self.provider}' is saturated; no slot freed within {self.wait_timeout:.0f}s.")
+            finally:
+                self._waiting -= 1
+
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+_limiters = {}
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        limiter = ProviderLimiter(provider, **CONCURRENCY_CONFIG)
+        _limiters[provider] = limiter
+    return limiter
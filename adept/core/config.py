@@ -1,6 +1,13 @@
+import os
+
+# Provider endpoints; override to point Adept at a proxy or a local mock (see benchmarks/mock_provider.py).
+GEMINI_BASE_URL = os.getenv("ADEPT_GEMINI_BASE_URL", "https://generativelanguage.googleapis.com").rstrip("/")
+GROQ_BASE_URL = os.getenv("ADEPT_GROQ_BASE_URL", "https://api.groq.com").rstrip("/")
+
 MODEL_CONFIG = {
     "gemini": {
-        "url_template": "https://generativelanguage.googleapis.com/v1/models/{model_name}:generateContent",
+        "url_template": GEMINI_BASE_URL + "/v1/models/{model_name}:generateContent",
+        "stream_url_template": GEMINI_BASE_URL + "/v1/models/{model_name}:streamGenerateContent",
         "models": {
             "default": "gemini-1.5-pro",
             "pro": "gemini-1.5-pro",
@@ -8,7 +15,8 @@ MODEL_CONFIG = {
         }
     },
     "groq": {
-        "url_template": "https://api.groq.com/openai/v1/chat/completions",
+        "url_template": GROQ_BASE_URL + "/openai/v1/chat/completions",
+        "stream_url_template": GROQ_BASE_URL + "/openai/v1/chat/completions",
         "models": {
             "default": "llama-3.1-8b-instant",
             "llama3-8b": "llama-3.1-8b-instant",
@@ -18,3 +26,107 @@ MODEL_CONFIG = {
         }
     }
 }
+
+# Local semantic index (see `adept index create`)
+DB_PATH = "./.adept_db"
+TABLE_NAME = "codebase"
+DAEMON_SOCKET = "./.adept_db/daemon.sock"
+# Tables at least this large get an IVF-PQ index; smaller ones are searched exhaustively.
+ANN_THRESHOLD = 10_000
+DEFAULT_NPROBES = 20
+
+# Embedding model used by `adept index create`. Queries always use the model recorded in the index.
+# backend: "torch", "onnx", or "onnx-int8" (int8-quantized ONNX Runtime export, much cheaper on CPU).
+# vector_dtype "float16" halves the table's on-disk and in-memory size.
+EMBEDDING_CONFIG = {
+    "model": os.getenv("ADEPT_EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
+    "backend": os.getenv("ADEPT_EMBEDDING_BACKEND", "torch"),
+    "vector_dtype": os.getenv("ADEPT_VECTOR_DTYPE", "float32"),
+    # Overrides the ONNX file picked for this CPU (e.g. "onnx/model_qint8_avx512.onnx").
+    "onnx_file": os.getenv("ADEPT_ONNX_FILE") or None,
+}
+
+# Retrieval modes: "auto" sends identifier-like queries to the BM25 index and everything else to hybrid search.
+SEARCH_CONFIG = {
+    "mode": os.getenv("ADEPT_SEARCH_MODE", "auto"),
+    # Reciprocal rank fusion constant; larger values flatten the advantage of top ranks.
+    "rrf_k": int(os.getenv("ADEPT_RRF_K", "60")),
+    # Candidates fetched from each of the vector and lexical searches before fusion.
+    "candidates": int(os.getenv("ADEPT_SEARCH_CANDIDATES", "20")),
+}
+
+# Context assembly for `chain execute --context` (see adept/core/context.py): over-fetch candidates,
+# merge adjacent chunks, drop near-duplicates, then pack into token_budget.
+CONTEXT_CONFIG = {
+    "token_budget": int(os.getenv("ADEPT_CONTEXT_BUDGET", "1500")),
+    "candidates": int(os.getenv("ADEPT_CONTEXT_CANDIDATES", "12")),
+    # Share of a span's lines found in a better-ranked span above which it is dropped.
+    "duplicate_threshold": float(os.getenv("ADEPT_CONTEXT_DUPLICATE_THRESHOLD", "0.8")),
+}
+
+# Shared HTTP client settings (one pooled client per provider; see adept/core/http.py)
+HTTP_CONFIG = {
+    "http2": os.getenv("ADEPT_HTTP2", "1") == "1",
+    "timeout": float(os.getenv("ADEPT_HTTP_TIMEOUT", "60")),
+    "connect_timeout": float(os.getenv("ADEPT_HTTP_CONNECT_TIMEOUT", "10")),
+    "max_connections": int(os.getenv("ADEPT_HTTP_MAX_CONNECTIONS", "100")),
+    "max_keepalive_connections": int(os.getenv("ADEPT_HTTP_MAX_KEEPALIVE", "20")),
+    "keepalive_expiry": float(os.getenv("ADEPT_HTTP_KEEPALIVE_EXPIRY", "30")),
+}
+
+# Per-provider limits for the async engine (API server); excess requests are rejected, not queued forever.
+CONCURRENCY_CONFIG = {
+    "max_concurrency": int(os.getenv("ADEPT_MAX_CONCURRENCY", "64")),
+    "max_waiting": int(os.getenv("ADEPT_MAX_WAITING", "256")),
+    "wait_timeout": float(os.getenv("ADEPT_WAIT_TIMEOUT", "10")),
+}
+
+# Retries, circuit breaking, provider failover and hedging for CLI requests (see adept/core/resilience.py).
+RESILIENCE_CONFIG = {
+    "max_retries": int(os.getenv("ADEPT_MAX_RETRIES", "2")),
+    "backoff_base": float(os.getenv("ADEPT_BACKOFF_BASE", "0.5")),
+    "backoff_max": float(os.getenv("ADEPT_BACKOFF_MAX", "8")),
+    # Upper bound on how long a provider's Retry-After can make us wait.
+    "retry_after_max": float(os.getenv("ADEPT_RETRY_AFTER_MAX", "30")),
+    "breaker_threshold": int(os.getenv("ADEPT_BREAKER_THRESHOLD", "5")),
+    "breaker_cooldown": float(os.getenv("ADEPT_BREAKER_COOLDOWN", "30")),
+    "fallback_order": [p for p in os.getenv("ADEPT_FALLBACK_ORDER", "groq,gemini").split(",") if p],
+    # Hedging waits for the provider's p95 latency once this many samples exist, else hedge_delay seconds.
+    "hedge_min_samples": int(os.getenv("ADEPT_HEDGE_MIN_SAMPLES", "20")),
+    "hedge_delay": float(os.getenv("ADEPT_HEDGE_DELAY", "5")),
+    # Latency samples persist here so hedging uses p95 from earlier runs; empty disables persistence.
+    "latency_path": os.getenv("ADEPT_LATENCY_PATH", "./.adept_db/latency.sqlite"),
+}
+
+# Starting quotas for `adept write batch`; providers' rate-limit headers refine them at runtime.
+RATE_LIMIT_CONFIG = {
+    provider: {
+        "requests_per_minute": float(os.getenv(f"ADEPT_{provider.upper()}_RPM", rpm)),
+        "tokens_per_minute": float(os.getenv(f"ADEPT_{provider.upper()}_TPM", tpm)),
+    }
+    for provider, rpm, tpm in (("gemini", "15", "1000000"), ("groq", "30", "6000"), ("default", "10", "10000"))
+}
+
+# On-disk cache of LLM responses for the CLI (see adept/core/cache.py); ADEPT_CACHE=0 disables it.
+CACHE_CONFIG = {
+    "enabled": os.getenv("ADEPT_CACHE", "1") == "1",
+    "path": os.getenv("ADEPT_CACHE_PATH", "./.adept_db/response_cache.sqlite"),
+    "ttl_seconds": float(os.getenv("ADEPT_CACHE_TTL", str(7 * 24 * 3600))),
+    "max_entries": int(os.getenv("ADEPT_CACHE_MAX_ENTRIES", "10000")),
+}
+
+# Token budget for the history replayed on each `chain execute` step (older steps are summarized).
+HISTORY_TOKEN_BUDGET = int(os.getenv("ADEPT_HISTORY_BUDGET", "4000"))
+
+# Micro-batching for the API's /search and /chat context: queries arriving within max_wait_ms share one encode + search.
+SEARCH_BATCH_CONFIG = {
+    "max_batch": int(os.getenv("ADEPT_SEARCH_MAX_BATCH", "32")),
+    "max_wait_ms": float(os.getenv("ADEPT_SEARCH_MAX_WAIT_MS", "5")),
+}
+
+# Server-side chat sessions for the API (see adept/core/sessions.py).
+# ADEPT_SESSION_DB enables a SQLite store so sessions survive restarts and LRU eviction.
+SESSION_CONFIG = {
+    "max_sessions": int(os.getenv("ADEPT_MAX_SESSIONS", "1000")),
+    "db_path": os.getenv("ADEPT_SESSION_DB") or None,
+}
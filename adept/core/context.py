@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+from typing import Callable
+from adept.core.chunking import estimate_tokens
+from adept.core.config import CONTEXT_CONFIG
+
+# Lines shorter than this ("}", "return x", blank) are too common to signal duplication.
+MIN_SIGNIFICANT_LINE = 8
+
+
+@dataclass
+class Span:
+    """A contiguous run of lines from one file, built from one or more retrieved chunks."""
+    path: str
+    start_line: int | None
+    end_line: int | None
+    text: str
+    rank: int
+    # First line of the best-ranked chunk in the span; truncation keeps the text from here.
+    focus_line: int | None = None
+
+    def as_result(self) -> dict:
+        return {"path": self.path, "start_line": self.start_line, "end_line": self.end_line, "text": self.text}
+
+
+def merge_spans(results: list) -> list:
+    """
+    Merges retrieved chunks that touch or overlap within the same file into
+    single spans, keeping the best (lowest) rank of their parts. Results
+    without line numbers stay as they are. Returns spans best-ranked first.
+    """
+    spans, by_path = [], {}
+    for rank, result in enumerate(results):
+        span = Span(result["path"], result.get("start_line"), result.get("end_line"), result["text"], rank, result.get("start_line"))
+        if span.start_line:
+            by_path.setdefault(span.path, []).append(span)
+        else:
+            spans.append(span)
+
+    for parts in by_path.values():
+        parts.sort(key=lambda span: span.start_line)
+        current = parts[0]
+        for span in parts[1:]:
+            if span.start_line <= current.end_line + 1:
+                _extend(current, span)
+            else:
+                spans.append(current)
+                current = span
+        spans.append(current)
+    return sorted(spans, key=lambda span: span.rank)
+
+
+def _extend(current: Span, span: Span) -> None:
+    # Skip the lines of `span` that `current` already covers.
+    overlap = current.end_line - span.start_line + 1
+    if span.end_line > current.end_line:
+        text = current.text if current.text.endswith("\n") else current.text + "\n"
+        current.text = text + "".join(span.text.splitlines(keepends=True)[max(0, overlap):])
+        current.end_line = span.end_line
+    if span.rank < current.rank:
+        current.rank, current.focus_line = span.rank, span.start_line
+
+
+def drop_near_duplicates(spans: list, threshold: float = CONTEXT_CONFIG["duplicate_threshold"]) -> list:
+    """
+    Drops spans whose significant lines are mostly (>= threshold) contained in
+    a better-ranked span, e.g. copied helpers or vendored files.
+    """
+    kept, seen = [], []
+    for span in spans:
+        lines = {line.strip() for line in span.text.splitlines() if len(line.strip()) >= MIN_SIGNIFICANT_LINE}
+        if lines and any(len(lines & other) / len(lines) >= threshold for other in seen):
+            continue
+        kept.append(span)
+        seen.append(lines)
+    return kept
+
+
+def pack_spans(spans: list, budget: int, count_tokens: Callable[[str], int] = estimate_tokens) -> list:
+    """
+    Greedily takes spans in rank order while they fit in `budget` tokens,
+    skipping any that would overflow. If even the best span is too large it
+    is cut down around its best-ranked chunk, so some context always fits.
+    """
+    packed, used = [], 0
+    for span in spans:
+        tokens = count_tokens(span.text)
+        if used + tokens <= budget:
+            packed.append(span)
+            used += tokens
+        elif not packed:
+            packed.append(_truncate(span, budget, count_tokens))
+            used = count_tokens(packed[0].text)
+    return packed
+
+
+def _truncate(span: Span, budget: int, count_tokens: Callable[[str], int]) -> Span:
+    skip = span.focus_line - span.start_line if span.start_line and span.focus_line else 0
+    kept, tokens = [], 0
+    for line in span.text.splitlines(keepends=True)[skip:]:
+        tokens += count_tokens(line)
+        if kept and tokens > budget:
+            break
+        kept.append(line)
+    start_line = span.start_line + skip if span.start_line else None
+    end_line = start_line + len(kept) - 1 if start_line else span.end_line
+    return Span(span.path, start_line, end_line, "".join(kept), span.rank, start_line)
+
+
+def assemble_context(results: list, budget: int = CONTEXT_CONFIG["token_budget"], count_tokens: Callable[[str], int] = estimate_tokens) -> list:
+    """
+    Turns over-fetched retrieval results into context for a prompt: merges
+    adjacent chunks, drops near-duplicates, and packs the best spans into
+    `budget` tokens. Returns result dicts accepted by build_context_prompt.
+    """
+    spans = pack_spans(drop_near_duplicates(merge_spans(results)), budget, count_tokens)
+    return [span.as_result() for span in spans]
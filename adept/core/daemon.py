@@ -0,0 +1,86 @@
+import json
+import os
+import socket
+import socketserver
+from datetime import timedelta
+from adept.core.config import DAEMON_SOCKET, DEFAULT_NPROBES, SEARCH_CONFIG
+from adept.core.retrieval import open_retriever
+
+# How often the daemon's table handle checks for a newer index version.
+REFRESH_INTERVAL = timedelta(seconds=5)
+
+
+class _RetrievalHandler(socketserver.StreamRequestHandler):
+    """Newline-delimited JSON: {"query": str, "limit": int, "nprobes": int, "mode": str, "paths": [str]} -> {"results": [...]} or {"error": str}."""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                results = self.server.retriever.search(
+                    request["query"], int(request.get("limit", 3)), int(request.get("nprobes", DEFAULT_NPROBES)),
+                    mode=request.get("mode", SEARCH_CONFIG["mode"]), paths=request.get("paths")
+                )
+                response = {"results": results}
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response, default=float).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _RetrievalServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path: str = DAEMON_SOCKET, on_ready=None) -> None:
+    """Keeps the embedder and table warm and answers queries over a Unix socket until interrupted."""
+    retriever = open_retriever(read_consistency_interval=REFRESH_INTERVAL)
+    if os.path.exists(socket_path):
+        if is_running(socket_path):
+            raise RuntimeError(f"A retrieval daemon is already listening on {socket_path}.")
+        os.unlink(socket_path)
+
+    with _RetrievalServer(socket_path, _RetrievalHandler) as server:
+        server.retriever = retriever
+        if on_ready:
+            on_ready()
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(socket_path)
+
+
+def is_running(socket_path: str = DAEMON_SOCKET) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+
+
+def query_daemon(query: str, limit: int = 3, mode: str = SEARCH_CONFIG["mode"], paths: list | None = None, socket_path: str = DAEMON_SOCKET, timeout: float = 5.0) -> list | None:
+    """
+    Asks a running daemon for the top matches.
+
+    Returns None if no daemon is listening, so callers can fall back to loading
+    the model in-process. Errors reported by the daemon are raised.
+    """
+    if not os.path.exists(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(json.dumps({"query": query, "limit": limit, "mode": mode, "paths": paths}).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+
+    response = json.loads(line)
+    if "error" in response:
+        raise RuntimeError(f"Retrieval daemon error: {response['error']}")
+    return response["results"]
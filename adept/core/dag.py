@@ -0,0 +1,139 @@
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable
+
+
+class ChainFileError(ValueError):
+    """Raised for chain files that are malformed, reference unknown steps or contain cycles."""
+
+
+@dataclass
+class StepResult:
+    status: str  # "ok", "failed" or "skipped"
+    output: str = ""
+    error: str = ""
+    elapsed: float = 0.0
+
+
+def load_chain_file(path: str) -> list:
+    """
+    Reads a YAML or JSON chain file into a list of validated steps.
+
+    The file holds `steps` (or is itself a list) of mappings with a `task`, an
+    optional `id` (defaults to step1, step2, ...), optional `depends_on` ids, and
+    optional per-step `provider` / `model` overrides.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    try:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+            data = yaml.safe_load(text)
+        else:
+            data = json.loads(text)
+    except Exception as e:
+        raise ChainFileError(f"Could not parse {path}: {e}")
+
+    raw_steps = data.get("steps") if isinstance(data, dict) else data
+    if not isinstance(raw_steps, list) or not raw_steps:
+        raise ChainFileError("A chain file needs a non-empty list of steps.")
+
+    steps = []
+    for i, raw in enumerate(raw_steps, 1):
+        if isinstance(raw, str):
+            raw = {"task": raw}
+        if not isinstance(raw, dict) or not raw.get("task"):
+            raise ChainFileError(f"Step {i} has no task.")
+        depends_on = raw.get("depends_on") or []
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        steps.append({**raw, "id": str(raw.get("id", f"step{i}")), "depends_on": [str(dep) for dep in depends_on]})
+
+    topological_order(steps)
+    return steps
+
+
+def topological_order(steps: list) -> list:
+    """Step ids in dependency order, ties broken by file order; raises ChainFileError on bad graphs."""
+    ids = [step["id"] for step in steps]
+    if len(set(ids)) != len(ids):
+        raise ChainFileError("Step ids must be unique.")
+    known = set(ids)
+    pending = {}
+    for step in steps:
+        unknown = [dep for dep in step["depends_on"] if dep not in known]
+        if unknown:
+            raise ChainFileError(f"Step '{step['id']}' depends on unknown step(s): {', '.join(unknown)}")
+        pending[step["id"]] = set(step["depends_on"])
+
+    order = []
+    while pending:
+        ready = [step_id for step_id in ids if step_id in pending and not pending[step_id]]
+        if not ready:
+            raise ChainFileError(f"Dependency cycle between steps: {', '.join(sorted(pending))}")
+        for step_id in ready:
+            del pending[step_id]
+            order.append(step_id)
+        for deps in pending.values():
+            deps.difference_update(ready)
+    return order
+
+
+def run_dag(steps: list, run_step: Callable[[dict, list], str], concurrency: int = 4, on_complete: Callable[[str, StepResult], None] | None = None) -> dict:
+    """
+    Runs steps as soon as their dependencies finish, at most `concurrency` at a time.
+
+    run_step(step, inputs) receives the (task, output) pairs of the step's
+    dependencies in declared order and returns its output. If a step fails, its
+    dependents are skipped; independent steps still run. on_complete is called
+    from the calling thread as each step settles. Returns {id: StepResult}.
+    """
+    by_id = {step["id"]: step for step in steps}
+    position = {step["id"]: i for i, step in enumerate(steps)}
+    waiting_on = {step["id"]: set(step["depends_on"]) for step in steps}
+    dependents = {step["id"]: [] for step in steps}
+    for step in steps:
+        for dep in step["depends_on"]:
+            dependents[dep].append(step["id"])
+
+    results = {}
+    ready = [step_id for step_id, deps in waiting_on.items() if not deps]
+
+    def settle(step_id: str, result: StepResult) -> None:
+        results[step_id] = result
+        if on_complete:
+            on_complete(step_id, result)
+        for child in dependents[step_id]:
+            if child in results:
+                continue
+            if result.status != "ok":
+                settle(child, StepResult("skipped", error=f"dependency '{step_id}' did not complete"))
+            else:
+                waiting_on[child].discard(step_id)
+                if not waiting_on[child]:
+                    ready.append(child)
+
+    def timed(step: dict, inputs: list) -> tuple[str, float]:
+        started = time.perf_counter()
+        return run_step(step, inputs), time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        running = {}
+        while ready or running:
+            ready.sort(key=position.get)
+            while ready:
+                step = by_id[ready.pop(0)]
+                inputs = [(by_id[dep]["task"], results[dep].output) for dep in step["depends_on"]]
+                running[pool.submit(timed, step, inputs)] = step["id"]
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: position[running[f]]):
+                step_id = running.pop(future)
+                try:
+                    output, elapsed = future.result()
+                    settle(step_id, StepResult("ok", output=output, elapsed=elapsed))
+                except Exception as e:
+                    settle(step_id, StepResult("failed", error=str(e)))
+    return results
@@ -0,0 +1,52 @@
+from rich.console import Console
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+from adept.core.cache import current_cache
+from adept.core import metrics
+
+
+def render_stream(console: Console, stream, title: str) -> str:
+    """Renders a TaskStream into a live-updating panel and returns the full reply."""
+    text = ""
+    with Live(Panel("[dim]Waiting for the first token...[/dim]", title=title), console=console, refresh_per_second=15) as live:
+        for delta in stream:
+            text += delta
+            live.update(Panel(text, title=title))
+    if stream.time_to_first_token is not None:
+        console.print(f"[dim]Time to first token: {stream.time_to_first_token:.2f}s · total: {stream.elapsed:.2f}s[/dim]")
+    return stream.text
+
+
+def print_cache_stats(console: Console) -> None:
+    """Reports response-cache hits and misses for this run, if the cache was used."""
+    cache = current_cache()
+    if cache and (cache.hits or cache.misses):
+        console.print(f"[dim]Response cache: {cache.hits} hits, {cache.misses} misses[/dim]")
+
+
+def print_profile(console: Console) -> None:
+    """Per-stage timing and token usage recorded under --profile. Stages may nest (e.g. chain.step > http.groq)."""
+    wall = metrics.wall_time()
+    table = Table(title="⏱️ Profile", caption=f"Wall time {wall:.2f}s · stages may nest")
+    table.add_column("Stage")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total (s)", justify="right")
+    table.add_column("Mean (ms)", justify="right")
+    table.add_column("Max (ms)", justify="right")
+    table.add_column("% wall", justify="right")
+    for name, calls, total, longest in metrics.stage_summary():
+        share = f"{total / wall * 100:.0f}%" if wall else ""
+        table.add_row(name, str(calls), f"{total:.3f}", f"{total / calls * 1000:.1f}", f"{longest * 1000:.1f}", share)
+    console.print(table)
+
+    tokens = metrics.token_summary()
+    if tokens:
+        usage = Table(title="🔢 Token usage")
+        usage.add_column("Provider")
+        usage.add_column("Model")
+        usage.add_column("Prompt", justify="right")
+        usage.add_column("Completion", justify="right")
+        for provider, model in sorted({(p, m) for p, m, _ in tokens}):
+            usage.add_row(provider, model, f"{tokens.get((provider, model, 'prompt'), 0):,}", f"{tokens.get((provider, model, 'completion'), 0):,}")
+        console.print(usage)
@@ -0,0 +1,109 @@
+import json
+import os
+import platform
+from adept.core.chunking import DEFAULT_MAX_TOKENS, estimate_tokens
+from adept.core.config import EMBEDDING_CONFIG
+from adept.core import metrics
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+VECTOR_DTYPES = ("float32", "float16")
+# Key under which the embedding spec is stored in the table's Arrow schema metadata.
+SCHEMA_METADATA_KEY = b"adept.embedding"
+# What indexes written before the spec was recorded were built with.
+LEGACY_SPEC = {"model": "all-MiniLM-L6-v2", "backend": "torch", "vector_dtype": "float32"}
+
+
+def embedding_spec(model: str = None, backend: str = None, vector_dtype: str = None) -> dict:
+    """The {model, backend, vector_dtype} an index is built with; defaults come from EMBEDDING_CONFIG."""
+    spec = {
+        "model": model or EMBEDDING_CONFIG["model"],
+        "backend": backend or EMBEDDING_CONFIG["backend"],
+        "vector_dtype": vector_dtype or EMBEDDING_CONFIG["vector_dtype"],
+    }
+    if spec["backend"] not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{spec['backend']}'. Choose from: {', '.join(EMBEDDING_BACKENDS)}.")
+    if spec["vector_dtype"] not in VECTOR_DTYPES:
+        raise ValueError(f"Unknown vector dtype '{spec['vector_dtype']}'. Choose from: {', '.join(VECTOR_DTYPES)}.")
+    return spec
+
+
+def table_spec(table) -> dict:
+    """Reads the embedding spec recorded in a table's schema metadata."""
+    raw = (table.schema.metadata or {}).get(SCHEMA_METADATA_KEY)
+    return json.loads(raw) if raw else dict(LEGACY_SPEC)
+
+
+def _quantized_onnx_file() -> str:
+    """Picks the int8 ONNX export matching this CPU, as published alongside sentence-transformers models."""
+    if EMBEDDING_CONFIG["onnx_file"]:
+        return EMBEDDING_CONFIG["onnx_file"]
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            flags = f.read()
+    except OSError:
+        flags = ""
+    if "avx512_vnni" in flags:
+        return "onnx/model_qint8_avx512_vnni.onnx"
+    if "avx512" in flags:
+        return "onnx/model_qint8_avx512.onnx"
+    return "onnx/model_quint8_avx2.onnx"
+
+
+def load_embedder(spec: dict = None):
+    """Loads the sentence transformer described by an embedding spec (the configured one by default)."""
+    spec = spec or embedding_spec()
+    # Imported here: sentence-transformers pulls in torch, which costs seconds at startup.
+    with metrics.span("model.load"):
+        from sentence_transformers import SentenceTransformer
+        if spec["backend"] == "torch":
+            return SentenceTransformer(spec["model"])
+        model_kwargs = {"file_name": _quantized_onnx_file()} if spec["backend"] == "onnx-int8" else {}
+        return SentenceTransformer(spec["model"], backend="onnx", model_kwargs=model_kwargs)
+
+
+class BatchEncoder:
+    """Encodes chunks in large batches, optionally fanned out over a pool of CPU worker processes."""
+
+    def __init__(self, model, batch_size: int = 128, workers: int = 1):
+        self.model = model
+        self.batch_size = batch_size
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.pool = None
+        if self.workers > 1:
+            self.pool = model.start_multi_process_pool(target_devices=["cpu"] * self.workers)
+
+    @property
+    def flush_size(self) -> int:
+        """How many chunks to accumulate before encoding, so every worker gets a full batch."""
+        return self.batch_size * self.workers
+
+    @property
+    def max_tokens(self) -> int:
+        """Largest chunk the model embeds without truncation, leaving room for [CLS]/[SEP]."""
+        max_seq_length = getattr(self.model, "max_seq_length", None) or DEFAULT_MAX_TOKENS
+        return max_seq_length - 2
+
+    def count_tokens(self, text: str) -> int:
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:
+            return estimate_tokens(text)
+        return len(tokenizer.encode(text, add_special_tokens=False))
+
+    def encode(self, texts: list):
+        with metrics.span("index.embed"):
+            if self.pool is not None:
+                return self.model.encode_multi_process(texts, self.pool, batch_size=self.batch_size)
+            return self.model.encode(texts, batch_size=self.batch_size)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.model.stop_multi_process_pool(self.pool)
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
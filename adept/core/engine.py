@@ -1,13 +1,29 @@
-import httpx
+import json
 import os
+import time
+from contextlib import ExitStack
+from functools import partial
 from dotenv import load_dotenv
 from adept.core.config import MODEL_CONFIG
+from adept.core.http import get_client, get_async_client
+from adept.core.concurrency import get_limiter
+from adept.core.cache import cache_key, get_cache
+from adept.core.config import RESILIENCE_CONFIG
+from adept.core.resilience import run_resilient
+from adept.core import metrics
 
 load_dotenv()
 
-def execute_task(task: str, provider: str, model: str, conversation_history: list = None) -> tuple[str, list]:
-    """Core engine that handles conversations for multiple providers."""
-    
+def prepare_request(task: str, provider: str, model: str, conversation_history: list = None, stream: bool = False, native: bool = False, keyed: bool = False) -> dict:
+    """
+    Builds the provider-specific URL, headers and payload for a conversation turn.
+
+    By default conversation_history is in our standard (Gemini) format. With
+    native=True it is already in the provider's own format: it is used without
+    translation or mutation, and the returned history stays provider-native.
+    keyed=True adds the response-cache key, for callers that use the cache.
+    """
+
     if provider not in MODEL_CONFIG:
         raise ValueError(f"Provider '{provider}' is not supported.")
 
@@ -20,51 +36,301 @@ def execute_task(task: str, provider: str, model: str, conversation_history: lis
 
     # --- Provider-Specific Logic ---
     if provider == "gemini":
-        url = config["url_template"].format(model_name=model_name)
+        url = config["stream_url_template" if stream else "url_template"].format(model_name=model_name)
         headers = {"Content-Type": "application/json", "x-goog-api-key": api_key}
-        params = None
-        
-        # The history from the UI is already in Gemini's format.
-        current_conversation = conversation_history if conversation_history else []
-        current_conversation.append({"role": "user", "parts": [{"text": task}]})
-        payload = {"contents": current_conversation}
+        # alt=sse makes streamGenerateContent emit server-sent events instead of one JSON array.
+        params = {"alt": "sse"} if stream else None
+
+        # The history from the UI is already in Gemini's format; copy it so the caller's list is untouched.
+        messages = list(conversation_history or [])
+        messages.append({"role": "user", "parts": [{"text": task}]})
+        payload = {"contents": messages}
 
     elif provider == "groq":
-        url = config["url_template"]
+        url = config["stream_url_template" if stream else "url_template"]
         headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
         params = None
 
         # Translate our standard (Gemini) history format to Groq's format.
-        groq_history = []
-        if conversation_history:
-            for msg in conversation_history:
-                # Our standard format uses 'model', Groq expects 'assistant'
-                role = "assistant" if msg["role"] == "model" else "user"
-                groq_history.append({"role": role, "content": msg["parts"][0]["text"]})
-        
-        groq_history.append({"role": "user", "content": task})
-        payload = {"messages": groq_history, "model": model_name}
-
-    # --- Common API Call Logic ---
-    with httpx.Client(timeout=60) as client:
-        response = client.post(url, json=payload, headers=headers, params=params)
-        response.raise_for_status()
-        result = response.json()
+        if native:
+            messages = list(conversation_history or [])
+        else:
+            messages = convert_history(conversation_history or [], "gemini", "groq")
 
-    # --- Provider-Specific Response Parsing ---
-    # We always return the history in our standard (Gemini) format.
+        messages.append({"role": "user", "content": task})
+        payload = {"messages": messages, "model": model_name}
+        if stream:
+            payload["stream"] = True
+
+    request = {
+        "provider": provider,
+        "model_name": model_name,
+        "url": url,
+        "headers": headers,
+        "params": params,
+        "payload": payload,
+        "messages": messages,
+        "native": native,
+    }
+    if keyed:
+        # Keyed now: finalize_history later appends the reply to the payload's message list.
+        request["cache_key"] = cache_key(request)
+    return request
+
+def convert_history(messages: list, source: str, target: str) -> list:
+    """Translates a history between provider formats (Gemini parts <-> OpenAI-style messages)."""
+    if source == target:
+        return list(messages)
+    if target == "groq":
+        # Our standard format uses 'model', Groq expects 'assistant'
+        return [
+            {"role": "assistant" if msg["role"] == "model" else "user", "content": msg["parts"][0]["text"]}
+            for msg in messages
+        ]
+    return [
+        {"role": "model" if msg["role"] == "assistant" else "user", "parts": [{"text": msg["content"]}]}
+        for msg in messages
+    ]
+
+def usage_counts(provider: str, result: dict) -> tuple[int, int] | None:
+    """(prompt, completion) tokens the provider reports for a response or final stream event, if any."""
     if provider == "gemini":
-        response_text = result["candidates"][0]["content"]["parts"][0]["text"]
-        current_conversation.append({"role": "model", "parts": [{"text": response_text}]})
-        final_history = current_conversation
+        usage = result.get("usageMetadata")
+        if usage:
+            return usage.get("promptTokenCount", 0), usage.get("candidatesTokenCount", 0)
     elif provider == "groq":
+        # Streamed Groq responses carry usage under x_groq in their last event.
+        usage = result.get("usage") or result.get("x_groq", {}).get("usage")
+        if usage:
+            return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    return None
+
+def usage_tokens(provider: str, result: dict) -> int | None:
+    """Total tokens (prompt + completion) the provider reports for a response, if any."""
+    counts = usage_counts(provider, result)
+    return sum(counts) if counts else None
+
+def _record_usage(request: dict, result: dict) -> None:
+    if metrics.is_enabled():
+        counts = usage_counts(request["provider"], result)
+        if counts:
+            metrics.record_tokens(request["provider"], request["model_name"], *counts)
+
+def parse_response(request: dict, result: dict) -> tuple[str, list]:
+    """Extracts the reply and returns it with the updated history in our standard (Gemini) format."""
+    if request["provider"] == "gemini":
+        response_text = result["candidates"][0]["content"]["parts"][0]["text"]
+    elif request["provider"] == "groq":
         response_text = result["choices"][0]["message"]["content"]
-        # Translate Groq's response back to our standard format before appending.
-        groq_history.append({"role": "assistant", "content": response_text})
-        
-        final_history = []
-        for msg in groq_history:
-            role = "model" if msg["role"] == "assistant" else "user"
-            final_history.append({"role": role, "parts": [{"text": msg["content"]}]})
+    return finalize_history(request, response_text)
+
+def finalize_history(request: dict, response_text: str) -> tuple[str, list]:
+    """Appends the reply to the conversation and returns it in our standard (Gemini) format, or natively if requested."""
+    provider = request["provider"]
+    messages = request["messages"]
+
+    if provider == "gemini":
+        messages.append({"role": "model", "parts": [{"text": response_text}]})
+        final_history = messages
+    elif provider == "groq":
+        # Translate Groq's history back to our standard format unless the caller keeps it native.
+        messages.append({"role": "assistant", "content": response_text})
+        final_history = messages if request["native"] else convert_history(messages, "groq", "gemini")
 
     return response_text, final_history
+
+def fallback_requests(task: str, provider: str, model: str, conversation_history: list = None, stream: bool = False, keyed: bool = False) -> list:
+    """Prepared requests for the other providers in the configured fallback order that have API keys."""
+    requests = []
+    for other in RESILIENCE_CONFIG["fallback_order"]:
+        if other == provider or other not in MODEL_CONFIG:
+            continue
+        try:
+            requests.append(prepare_request(task, other, model, conversation_history, stream=stream, keyed=keyed))
+        except ValueError:
+            continue
+    return requests
+
+def _send(request: dict, on_response=None) -> tuple[dict, str, list]:
+    with metrics.span(f"http.{request['provider']}"):
+        response = get_client(request["provider"]).post(request["url"], json=request["payload"], headers=request["headers"], params=request["params"])
+        if response.is_error and on_response:
+            # Error responses carry rate-limit state too (429s with Retry-After / x-ratelimit-*).
+            on_response(request, response, None)
+        response.raise_for_status()
+    with metrics.span("response.parse"):
+        result = response.json()
+        parsed = parse_response(request, result)
+    _record_usage(request, result)
+    if on_response:
+        on_response(request, response, result)
+    return (request, *parsed)
+
+def execute_task(task: str, provider: str, model: str, conversation_history: list = None, native: bool = False, cache: bool = False, fallback: bool = False, hedge: bool = False, on_event=None, on_response=None, before_send=None) -> tuple[str, list]:
+    """
+    Core engine that handles conversations for multiple providers.
+
+    Transient failures are retried with backoff. With cache=True, identical
+    requests are answered from the on-disk response cache; with fallback=True,
+    other providers are tried once this one gives up, and with hedge=True a slow
+    request is raced against the first fallback. on_event receives retry and
+    failover notices, and on_response(request, response, result) each
+    provider response (e.g. for rate-limit headers and usage; result is None
+    for error responses). before_send(request) runs before every attempt that
+    really goes out, retries included but not cache hits (e.g. to wait for
+    rate-limit quota).
+    """
+    response_cache = get_cache() if cache else None
+    request = prepare_request(task, provider, model, conversation_history, native=native, keyed=bool(response_cache))
+    if response_cache:
+        with metrics.span("cache.lookup"):
+            cached = response_cache.get(request["cache_key"])
+        if cached is not None:
+            return finalize_history(request, cached)
+
+    # Native histories are provider-specific, so they cannot fail over.
+    candidates = [request]
+    if (fallback or hedge) and not native:
+        candidates += fallback_requests(task, provider, model, conversation_history, keyed=bool(response_cache))
+
+    # Without fallback, other providers are only raced as hedges, never failed over to.
+    served, response_text, history = run_resilient(candidates, partial(_send, on_response=on_response), hedge=hedge, failover=fallback, on_event=on_event, before_send=before_send)
+    if response_cache:
+        # Keyed from the served request's pre-send payload (see prepare_request).
+        response_cache.put(served["cache_key"], response_text)
+    return response_text, history
+
+async def execute_task_async(task: str, provider: str, model: str, conversation_history: list = None, native: bool = False) -> tuple[str, list]:
+    """
+    Non-blocking execute_task for the API server.
+
+    Requests run under the provider's concurrency limiter, which raises
+    ProviderBusyError instead of queueing without bound when saturated.
+    """
+    request = prepare_request(task, provider, model, conversation_history, native=native)
+
+    async with get_limiter(provider).slot():
+        with metrics.span(f"http.{provider}"):
+            response = await get_async_client(provider).post(request["url"], json=request["payload"], headers=request["headers"], params=request["params"])
+    response.raise_for_status()
+
+    with metrics.span("response.parse"):
+        result = response.json()
+        parsed = parse_response(request, result)
+    _record_usage(request, result)
+    return parsed
+
+def decode_stream_event(line: str) -> dict | None:
+    """Returns the JSON payload of one server-sent-event line, if any."""
+    if not line.startswith("data:"):
+        return None
+    data = line[len("data:"):].strip()
+    if not data or data == "[DONE]":
+        return None
+    return json.loads(data)
+
+def parse_stream_event(provider: str, line: str) -> str | None:
+    """Returns the text delta carried by one server-sent-event line, if any."""
+    event = decode_stream_event(line)
+    return None if event is None else stream_event_text(provider, event)
+
+def stream_event_text(provider: str, event: dict) -> str | None:
+    if provider == "gemini":
+        candidates = event.get("candidates") or [{}]
+        parts = candidates[0].get("content", {}).get("parts") or [{}]
+        return parts[0].get("text")
+    elif provider == "groq":
+        choices = event.get("choices") or [{}]
+        return choices[0].get("delta", {}).get("content")
+
+class TaskStream:
+    """
+    Iterates over reply text as the provider generates it.
+
+    Once iteration finishes, text and history hold the full reply and the updated
+    (Gemini-format) conversation, and time_to_first_token the latency in seconds.
+    """
+
+    def __init__(self, request: dict, cache=None, fallbacks: list = None, on_event=None):
+        self.request = request
+        self.cache = cache
+        self.fallbacks = fallbacks or []
+        self.on_event = on_event
+        self.cached = False
+        self.text = ""
+        self.history = None
+        self.time_to_first_token = None
+        self.elapsed = None
+        self._started = None
+        self._parts = []
+
+    def _on_line(self, line: str) -> str | None:
+        event = decode_stream_event(line)
+        if event is None:
+            return None
+        _record_usage(self.request, event)
+        delta = stream_event_text(self.request["provider"], event)
+        if delta:
+            if self.time_to_first_token is None:
+                self.time_to_first_token = time.perf_counter() - self._started
+            self._parts.append(delta)
+        return delta
+
+    def _finish(self) -> None:
+        self.elapsed = time.perf_counter() - self._started
+        if not self.cached:
+            metrics.observe(f"http.{self.request['provider']}", self.elapsed)
+            if self.time_to_first_token is not None:
+                metrics.observe("stream.first_token", self.time_to_first_token)
+        self.text, self.history = finalize_history(self.request, "".join(self._parts))
+        if self.cache and not self.cached:
+            self.cache.put(self.request["cache_key"], self.text)
+
+    def _open(self, request: dict) -> tuple[dict, ExitStack, object]:
+        stack = ExitStack()
+        try:
+            response = stack.enter_context(get_client(request["provider"]).stream("POST", request["url"], json=request["payload"], headers=request["headers"], params=request["params"]))
+            response.raise_for_status()
+        except BaseException:
+            stack.close()
+            raise
+        return request, stack, response
+
+    def __iter__(self):
+        self._started = time.perf_counter()
+        cached = self.cache.get(self.request["cache_key"]) if self.cache else None
+        if cached is not None:
+            # A cache hit arrives as a single delta.
+            self.cached = True
+            self.time_to_first_token = time.perf_counter() - self._started
+            self._parts.append(cached)
+            yield cached
+            self._finish()
+            return
+        # Retries and failover apply until the response starts; a stream that breaks midway is not replayed.
+        self.request, stack, response = run_resilient([self.request, *self.fallbacks], self._open, track_latency=False, on_event=self.on_event)
+        with stack:
+            for line in response.iter_lines():
+                delta = self._on_line(line)
+                if delta:
+                    yield delta
+        self._finish()
+
+    async def __aiter__(self):
+        request = self.request
+        self._started = time.perf_counter()
+        async with get_limiter(request["provider"]).slot():
+            async with get_async_client(request["provider"]).stream("POST", request["url"], json=request["payload"], headers=request["headers"], params=request["params"]) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    delta = self._on_line(line)
+                    if delta:
+                        yield delta
+        self._finish()
+
+def stream_task(task: str, provider: str, model: str, conversation_history: list = None, native: bool = False, cache: bool = False, fallback: bool = False, on_event=None) -> TaskStream:
+    """Streaming execute_task: iterate (or async-iterate) the result for text deltas."""
+    response_cache = get_cache() if cache else None
+    request = prepare_request(task, provider, model, conversation_history, stream=True, native=native, keyed=bool(response_cache))
+    fallbacks = fallback_requests(task, provider, model, conversation_history, stream=True, keyed=bool(response_cache)) if fallback and not native else []
+    return TaskStream(request, response_cache, fallbacks, on_event)
@@ -0,0 +1,87 @@
+import re
+from typing import Callable
+from adept.core.chunking import estimate_tokens
+
+# Share of the history budget the rolling summary may use; the rest holds verbatim turns.
+SUMMARY_SHARE = 0.25
+# Characters of each folded output kept in the summary.
+SUMMARY_LINE_CHARS = 200
+TRUNCATION_MARKER = "\n[... truncated to fit the history budget]"
+
+
+def summarize_turn(step: int, task: str, output: str) -> str:
+    """Extractive one-line summary of a finished step: the task and the opening of its output."""
+    task = " ".join(task.split())
+    output = " ".join(output.split())
+    # Keep the first sentence if it is short enough, otherwise a hard prefix.
+    sentence = re.split(r"(?<=[.!?])\s", output, maxsplit=1)[0]
+    gist = sentence if len(sentence) <= SUMMARY_LINE_CHARS else output[:SUMMARY_LINE_CHARS].rstrip() + "..."
+    return f"Step {step}: {task[:SUMMARY_LINE_CHARS]} -> {gist}"
+
+
+class HistoryWindow:
+    """
+    Conversation history for a chain, bounded by a token budget.
+
+    The most recent turns are kept verbatim; older ones are folded into a rolling
+    extractive summary, so each step's prompt stays roughly the same size no
+    matter how long the chain gets. Token counts are local estimates.
+    """
+
+    def __init__(self, budget: int, count_tokens: Callable[[str], int] = estimate_tokens):
+        self.budget = budget
+        self.count_tokens = count_tokens
+        self.turns = []  # (step, task, output, tokens), oldest first
+        self.summary = []  # (line, tokens), oldest first
+        self.folded = 0
+
+    def add(self, task: str, output: str) -> None:
+        step = self.folded + len(self.turns) + 1
+        self.turns.append((step, task, output, self.count_tokens(task) + self.count_tokens(output)))
+        self._fit()
+
+    def _fit(self) -> None:
+        summary_budget = int(self.budget * SUMMARY_SHARE)
+        # Always keep the latest turn verbatim; later steps usually refer to it directly.
+        while len(self.turns) > 1 and self.verbatim_tokens + self.summary_tokens > self.budget:
+            step, task, output, _ = self.turns.pop(0)
+            line = summarize_turn(step, task, output)
+            self.summary.append((line, self.count_tokens(line)))
+            self.folded += 1
+            while len(self.summary) > 1 and self.summary_tokens > summary_budget:
+                self.summary.pop(0)
+
+    @property
+    def verbatim_tokens(self) -> int:
+        return sum(turn[3] for turn in self.turns)
+
+    @property
+    def summary_tokens(self) -> int:
+        return sum(tokens for _, tokens in self.summary)
+
+    def messages(self) -> list:
+        """The history in our standard (Gemini) format: optional summary, then verbatim turns."""
+        history = []
+        if self.summary:
+            omitted = self.folded - len(self.summary)
+            lines = [line for line, _ in self.summary]
+            if omitted:
+                lines.insert(0, f"({omitted} earlier steps omitted)")
+            history.append({"role": "user", "parts": [{"text": "Summary of earlier steps in this chain:\n" + "\n".join(lines)}]})
+            history.append({"role": "model", "parts": [{"text": "Understood."}]})
+
+        remaining = self.budget - self.summary_tokens
+        for step, task, output, tokens in self.turns:
+            if tokens > remaining:
+                # Only the latest turn can overflow the budget on its own; keep its head
+                # (~4 characters per token, as in estimate_tokens).
+                keep = max(0, remaining - self.count_tokens(task)) * 4
+                output = output[:keep] + TRUNCATION_MARKER
+            history.append({"role": "user", "parts": [{"text": task}]})
+            history.append({"role": "model", "parts": [{"text": output}]})
+        return history
+
+
+def prompt_tokens(history: list, task: str, count_tokens: Callable[[str], int] = estimate_tokens) -> int:
+    """Estimated prompt size for a step: its (Gemini-format) history plus the new task."""
+    return sum(count_tokens(message["parts"][0]["text"]) for message in history) + count_tokens(task)
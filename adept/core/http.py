@@ -0,0 +1,58 @@
+import atexit
+import importlib.util
+import threading
+import httpx
+from adept.core.config import HTTP_CONFIG
+
+_clients = {}
+_async_clients = {}
+_lock = threading.Lock()
+
+
+def client_options() -> dict:
+    """Connection-pool, timeout and protocol settings shared by every provider client."""
+    return {
+        # HTTP/2 needs the optional `h2` package (pip install "httpx[http2]").
+        "http2": HTTP_CONFIG["http2"] and importlib.util.find_spec("h2") is not None,
+        "timeout": httpx.Timeout(HTTP_CONFIG["timeout"], connect=HTTP_CONFIG["connect_timeout"]),
+        "limits": httpx.Limits(
+            max_connections=HTTP_CONFIG["max_connections"],
+            max_keepalive_connections=HTTP_CONFIG["max_keepalive_connections"],
+            keepalive_expiry=HTTP_CONFIG["keepalive_expiry"],
+        ),
+    }
+
+
+def get_client(provider: str) -> httpx.Client:
+    """Returns the process-wide pooled client for a provider, so connections are reused across calls."""
+    with _lock:
+        client = _clients.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.Client(**client_options())
+            _clients[provider] = client
+        return client
+
+
+def get_async_client(provider: str) -> httpx.AsyncClient:
+    """Async counterpart of get_client; must be used from the event loop that will close it."""
+    client = _async_clients.get(provider)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(**client_options())
+        _async_clients[provider] = client
+    return client
+
+
+async def aclose_async_clients() -> None:
+    for client in _async_clients.values():
+        await client.aclose()
+    _async_clients.clear()
+
+
+def close_clients() -> None:
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+atexit.register(close_clients)
@@ -0,0 +1,50 @@
+import hashlib
+import json
+import os
+
+MANIFEST_FILE = "manifest.json"
+
+
+def manifest_path(db_path: str) -> str:
+    """Returns the location of the per-file manifest kept alongside the index."""
+    return os.path.join(db_path, MANIFEST_FILE)
+
+
+def load_manifest(db_path: str, settings: dict) -> dict:
+    """
+    Loads the {path: {mtime, size, hash}} manifest.
+
+    Returns an empty manifest (forcing a full rebuild) if it is missing, corrupt,
+    or was written with different index settings (e.g. another chunker).
+    """
+    try:
+        with open(manifest_path(db_path), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if manifest.get("settings") != settings:
+        return {}
+    return manifest.get("files", {})
+
+
+def save_manifest(db_path: str, files: dict, settings: dict) -> None:
+    """Writes the manifest atomically so an interrupted run never leaves a partial file."""
+    os.makedirs(db_path, exist_ok=True)
+    path = manifest_path(db_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "settings": settings, "files": files}, f)
+    os.replace(tmp_path, path)
+
+
+def hash_content(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_unchanged(entry: dict | None, stat: os.stat_result) -> bool:
+    """Cheap check that lets unchanged files skip being read at all."""
+    return bool(entry) and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size
+
+
+def make_entry(stat: os.stat_result, content_hash: str) -> dict:
+    return {"mtime": stat.st_mtime_ns, "size": stat.st_size, "hash": content_hash}
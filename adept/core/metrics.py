@@ -0,0 +1,130 @@
+import threading
+import time
+from contextlib import nullcontext
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels).
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_enabled = False
+_enabled_at = None
+_lock = threading.Lock()
+_stages = {}
+_tokens = {}
+_NOOP = nullcontext()
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.total += seconds
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+
+class _Span:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def enable() -> None:
+    """Starts recording. Until then span() returns a shared no-op and nothing is stored."""
+    global _enabled, _enabled_at
+    _enabled = True
+    _enabled_at = _enabled_at or time.perf_counter()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def span(name: str):
+    """Context manager timing one stage (e.g. "http.groq", "retrieval.search")."""
+    return _Span(name) if _enabled else _NOOP
+
+
+def observe(name: str, seconds: float) -> None:
+    """Records a duration measured elsewhere under a stage name."""
+    if not _enabled:
+        return
+    with _lock:
+        histogram = _stages.get(name)
+        if histogram is None:
+            histogram = _stages[name] = _Histogram()
+        histogram.add(seconds)
+
+
+def record_tokens(provider: str, model: str, prompt: int | None, completion: int | None) -> None:
+    """Adds the token usage a provider reported for one response."""
+    if not _enabled:
+        return
+    with _lock:
+        for kind, count in (("prompt", prompt), ("completion", completion)):
+            if count:
+                key = (provider, model, kind)
+                _tokens[key] = _tokens.get(key, 0) + count
+
+
+def stage_summary() -> list:
+    """(stage, calls, total seconds, max seconds) rows, slowest total first."""
+    with _lock:
+        rows = [(name, h.count, h.total, h.max) for name, h in _stages.items()]
+    return sorted(rows, key=lambda row: row[2], reverse=True)
+
+
+def token_summary() -> dict:
+    """{(provider, model, kind): tokens} recorded so far."""
+    with _lock:
+        return dict(_tokens)
+
+
+def wall_time() -> float:
+    """Seconds since recording was enabled."""
+    return time.perf_counter() - _enabled_at if _enabled_at else 0.0
+
+
+def render_prometheus() -> str:
+    """All recorded metrics in the Prometheus text exposition format."""
+    lines = [
+        "# HELP adept_stage_seconds Time spent in each instrumented stage.",
+        "# TYPE adept_stage_seconds histogram",
+    ]
+    with _lock:
+        stages = {name: (list(h.counts), h.total, h.count) for name, h in _stages.items()}
+        tokens = dict(_tokens)
+    for name, (counts, total, count) in sorted(stages.items()):
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS, counts):
+            cumulative += bucket
+            lines.append(f'adept_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'adept_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {count}')
+        lines.append(f'adept_stage_seconds_sum{{stage="{name}"}} {total}')
+        lines.append(f'adept_stage_seconds_count{{stage="{name}"}} {count}')
+
+    lines += [
+        "# HELP adept_tokens_total Tokens reported by providers.",
+        "# TYPE adept_tokens_total counter",
+    ]
+    for (provider, model, kind), count in sorted(tokens.items()):
+        lines.append(f'adept_tokens_total{{provider="{provider}",model="{model}",kind="{kind}"}} {count}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,126 @@
+import re
+import threading
+import time
+from adept.core.config import RATE_LIMIT_CONFIG
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: str) -> float | None:
+    """Parses rate-limit reset values such as "7.66s", "2m59.56s" or "120ms" into seconds."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    parts = _DURATION_PART.findall(value or "")
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """Refills `per_second` units continuously up to `capacity`; may be paused until a server-given reset."""
+
+    def __init__(self, capacity: float, per_second: float):
+        self.capacity = capacity
+        self.per_second = per_second
+        self.level = capacity
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.per_second)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (requests larger than capacity only need a full bucket)."""
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        needed = min(amount, self.capacity)
+        return 0.0 if self.level >= needed else (needed - self.level) / self.per_second
+
+    def take(self, amount: float) -> None:
+        # May go negative for oversized or under-estimated requests; the debt delays later ones.
+        self.level -= amount
+
+    def sync(self, remaining: float | None, reset: float | None, now: float) -> None:
+        """Adopts the server's view of remaining quota when it is lower than ours."""
+        self._refill(now)
+        if remaining is None:
+            return
+        self.level = min(self.level, remaining)
+        if remaining <= 0 and reset:
+            self.pause(reset, now)
+
+    def pause(self, seconds: float, now: float) -> None:
+        self.paused_until = max(self.paused_until, now + seconds)
+
+
+class ProviderRateLimiter:
+    """
+    Paces requests to one provider against requests/min and tokens/min budgets.
+
+    acquire() blocks until both buckets can cover a request; observe() folds
+    in the provider's rate-limit headers and actual token usage so estimates
+    do not drift from the real quota, including from rejected (429) responses.
+    """
+
+    def __init__(self, provider: str, requests_per_minute: float, tokens_per_minute: float):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                delay = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+                if delay <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    return
+            time.sleep(min(delay, 1.0))
+
+    def observe(self, headers, estimated_tokens: int, used_tokens: int | None, status_code: int = 200) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if used_tokens is not None:
+                # Settle the estimate charged in acquire() against what the request really used.
+                self.tokens.level += estimated_tokens - used_tokens
+            # OpenAI-style headers (Groq). The token limit is per minute, so it also sets the refill rate.
+            token_limit = headers.get("x-ratelimit-limit-tokens")
+            if token_limit and token_limit.isdigit():
+                self.tokens.capacity = float(token_limit)
+                self.tokens.per_second = float(token_limit) / 60
+            self.tokens.sync(_number(headers.get("x-ratelimit-remaining-tokens")), parse_duration(headers.get("x-ratelimit-reset-tokens")), now)
+            self.requests.sync(_number(headers.get("x-ratelimit-remaining-requests")), parse_duration(headers.get("x-ratelimit-reset-requests")), now)
+            if status_code == 429:
+                # Over quota whatever our estimate says: wait for a refill, and for Retry-After if given.
+                self.requests.level = min(self.requests.level, 0.0)
+                pause = parse_duration(headers.get("retry-after"))
+                if pause:
+                    self.requests.pause(pause, now)
+                    self.tokens.pause(pause, now)
+
+
+def _number(value: str | None) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> ProviderRateLimiter:
+    """Returns the process-wide rate limiter for a provider, sized from RATE_LIMIT_CONFIG."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            limits = RATE_LIMIT_CONFIG.get(provider, RATE_LIMIT_CONFIG["default"])
+            _limiters[provider] = ProviderRateLimiter(provider, limits["requests_per_minute"], limits["tokens_per_minute"])
+        return _limiters[provider]
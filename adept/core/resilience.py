@@ -0,0 +1,256 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from typing import Callable
+import httpx
+from adept.core.config import RESILIENCE_CONFIG
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when every candidate provider's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a provider after repeated failures.
+
+    After `threshold` consecutive failures the breaker opens for `cooldown`
+    seconds; then trial requests are let through, and the first success closes it.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            return self.opened_at is None or time.monotonic() - self.opened_at >= self.cooldown
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class LatencyStore:
+    """SQLite log of request latencies per provider, so each CLI run starts with earlier runs' samples."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS latencies (id INTEGER PRIMARY KEY, provider TEXT NOT NULL, seconds REAL NOT NULL)"
+        )
+
+    def load(self, provider: str, limit: int) -> list:
+        """The provider's most recent `limit` samples, oldest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seconds FROM latencies WHERE provider = ? ORDER BY id DESC LIMIT ?", (provider, limit)
+            ).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def add(self, provider: str, seconds: float, keep: int) -> None:
+        """Records a sample and drops all but the provider's newest `keep`."""
+        with self._lock, self._db:
+            self._db.execute("INSERT INTO latencies (provider, seconds) VALUES (?, ?)", (provider, seconds))
+            self._db.execute(
+                "DELETE FROM latencies WHERE provider = ? AND id NOT IN "
+                "(SELECT id FROM latencies WHERE provider = ? ORDER BY id DESC LIMIT ?)",
+                (provider, provider, keep),
+            )
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class LatencyTracker:
+    """
+    Rolling window of successful request latencies, used to pick the hedging deadline.
+
+    With a store, the window starts from the provider's persisted samples and
+    every new sample is written back.
+    """
+
+    def __init__(self, window: int = 200, provider: str | None = None, store: LatencyStore | None = None):
+        self.window = window
+        self.provider = provider
+        self._store = store
+        self._samples = deque(store.load(provider, window) if store else (), maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+        if self._store:
+            self._store.add(self.provider, seconds, self.window)
+
+    def p95(self, min_samples: int) -> float | None:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+_breakers = {}
+_latencies = {}
+_latency_store = None
+_state_lock = threading.Lock()
+_hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="adept-hedge")
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    with _state_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(RESILIENCE_CONFIG["breaker_threshold"], RESILIENCE_CONFIG["breaker_cooldown"])
+        return _breakers[provider]
+
+
+def get_latency_tracker(provider: str) -> LatencyTracker:
+    """The provider's tracker, seeded from the latency store (opened on first use) unless latency_path is empty."""
+    global _latency_store
+    with _state_lock:
+        if provider not in _latencies:
+            if _latency_store is None and RESILIENCE_CONFIG["latency_path"]:
+                _latency_store = LatencyStore(RESILIENCE_CONFIG["latency_path"])
+            _latencies[provider] = LatencyTracker(provider=provider, store=_latency_store)
+        return _latencies[provider]
+
+
+def is_retryable(error: Exception) -> bool:
+    """429s, 5xx responses, timeouts and connection failures are worth retrying; other errors are not."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS
+    return isinstance(error, httpx.TransportError)
+
+
+def retry_after(error: Exception) -> float | None:
+    """Seconds requested by the provider's Retry-After header, if any."""
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+    value = error.response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def describe(error: Exception) -> str:
+    """Short description of a failed attempt for retry notices."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code}"
+    return type(error).__name__
+
+
+def backoff_delay(attempt: int, requested: float | None = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the provider's Retry-After."""
+    cap = min(RESILIENCE_CONFIG["backoff_max"], RESILIENCE_CONFIG["backoff_base"] * 2 ** attempt)
+    delay = random.uniform(0, cap)
+    if requested is not None:
+        delay = max(delay, min(requested, RESILIENCE_CONFIG["retry_after_max"]))
+    return delay
+
+
+def _attempt(send: Callable, request: dict, track_latency: bool, before_send: Callable | None = None):
+    provider = request["provider"]
+    if before_send:
+        # Outside the timed section: waiting for quota is not provider latency.
+        before_send(request)
+    started = time.perf_counter()
+    try:
+        result = send(request)
+    except Exception as e:
+        if is_retryable(e):
+            get_breaker(provider).record_failure()
+        raise
+    get_breaker(provider).record_success()
+    if track_latency:
+        get_latency_tracker(provider).record(time.perf_counter() - started)
+    return result
+
+
+def _hedged(send: Callable, request: dict, backup: dict, before_send: Callable | None = None):
+    """Sends `request`; if it hasn't answered by its provider's p95 latency, races `backup` against it."""
+    deadline = get_latency_tracker(request["provider"]).p95(RESILIENCE_CONFIG["hedge_min_samples"])
+    if deadline is None:
+        deadline = RESILIENCE_CONFIG["hedge_delay"]
+    pending = {_hedge_pool.submit(_attempt, send, request, True, before_send)}
+    done, _ = wait(pending, timeout=deadline)
+    if not done and get_breaker(backup["provider"]).allow():
+        pending.add(_hedge_pool.submit(_attempt, send, backup, True, before_send))
+
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                # The slower request keeps running in the background; its result is dropped.
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+def run_resilient(requests: list, send: Callable, hedge: bool = False, failover: bool = True, track_latency: bool = True, on_event: Callable[[str], None] | None = None, before_send: Callable[[dict], None] | None = None):
+    """
+    Sends the first request, retrying and failing over down the list.
+
+    `requests` are prepared requests for the primary provider followed by its
+    fallbacks. Retryable failures are retried with jittered backoff (honouring
+    Retry-After) up to max_retries times, then the next provider is tried.
+    Providers whose circuit breaker is open are skipped. With hedge=True, a
+    slow request is raced against the next provider's. With failover=False
+    only the first request is retried; the others serve as hedges only.
+    before_send(request) runs before every attempt, retries and hedges included.
+    """
+    error = None
+    for index, request in enumerate(requests if failover else requests[:1]):
+        provider = request["provider"]
+        if not get_breaker(provider).allow():
+            error = CircuitOpenError(f"Circuit breaker for '{provider}' is open after repeated failures.")
+            continue
+        backup = requests[index + 1] if hedge and index + 1 < len(requests) else None
+
+        for attempt in range(RESILIENCE_CONFIG["max_retries"] + 1):
+            try:
+                if backup:
+                    return _hedged(send, request, backup, before_send)
+                return _attempt(send, request, track_latency, before_send)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                error = e
+            if attempt == RESILIENCE_CONFIG["max_retries"] or not get_breaker(provider).allow():
+                break
+            delay = backoff_delay(attempt, retry_after(error))
+            if on_event:
+                on_event(f"{provider} failed ({describe(error)}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+        if on_event and failover and index + 1 < len(requests):
+            on_event(f"{provider} unavailable; falling back to {requests[index + 1]['provider']}")
+    raise error
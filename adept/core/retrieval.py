@@ -0,0 +1,266 @@
+import os
+import re
+import threading
+from adept.core.config import DB_PATH, TABLE_NAME, DEFAULT_NPROBES, SEARCH_CONFIG
+from adept.core.embeddings import load_embedder, table_spec
+from adept.core import metrics
+
+
+SEARCH_MODES = ("auto", "hybrid", "vector", "lexical")
+
+# A code identifier, optionally dotted (module.attr) or called (name()).
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*(?:\(\))?$")
+_CAMEL_CASE = re.compile(r"[a-z0-9][A-Z]")
+
+
+class IndexNotFoundError(Exception):
+    """Raised when no usable `codebase` index exists in the current directory."""
+
+
+def code_terms(query: str) -> list:
+    """The words of a query that are unmistakably code: snake_case, camelCase, CONSTANT_CASE or dotted."""
+    words = [word.removesuffix("()") for word in query.split()]
+    return [word for word in words if "_" in word or "." in word or _CAMEL_CASE.search(word) or (word.isupper() and len(word) > 1)]
+
+
+def is_identifier_query(query: str) -> bool:
+    """
+    True for short queries made only of identifier-like words, at least one of
+    which is unmistakably code. "execute_task" and "where is MODEL_CONFIG"
+    qualify; "how are retries handled" does not.
+    """
+    words = query.split()
+    if not words or len(words) > 4 or not all(_IDENTIFIER.match(word) for word in words):
+        return False
+    return bool(code_terms(query))
+
+
+def resolve_mode(query: str, mode: str, lexical_available: bool = True) -> str:
+    """Turns a requested search mode into the one that will run ("auto" picks per query)."""
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}'. Choose from: {', '.join(SEARCH_MODES)}.")
+    if mode == "lexical" and not lexical_available:
+        raise IndexNotFoundError("No full-text index found. Please re-run 'adept index create'.")
+    if mode == "auto":
+        mode = "lexical" if is_identifier_query(query) else "hybrid"
+    if not lexical_available:
+        return "vector"
+    return mode
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    Translates a path glob into an anchored regular expression over indexed paths.
+
+    `*` and `?` stay within one directory, `**` spans directories, a trailing
+    slash matches everything below a directory, and patterns without a slash
+    match file names at any depth (as in .gitignore).
+    """
+    pattern = pattern.strip().removeprefix("./")
+    if pattern.endswith("/"):
+        pattern += "**"
+    anchored = "/" in pattern.rstrip("/")
+    regex, i = "", 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex, i = regex + "(.*/)?", i + 3
+        elif pattern.startswith("**", i):
+            regex, i = regex + ".*", i + 2
+        elif pattern[i] == "*":
+            regex, i = regex + "[^/]*", i + 1
+        elif pattern[i] == "?":
+            regex, i = regex + "[^/]", i + 1
+        else:
+            regex, i = regex + ("\\" + pattern[i] if pattern[i] in ".^$+{}[]|()\\" else pattern[i]), i + 1
+    return ("^" if anchored else "^(.*/)?") + regex + "$"
+
+
+def path_filter(patterns: list | None) -> str | None:
+    """SQL prefilter keeping chunks whose path matches any of the globs (None when there are none)."""
+    if not patterns:
+        return None
+    clauses = ["regexp_like(path, '" + glob_to_regex(pattern).replace("'", "''") + "')" for pattern in patterns]
+    return "(" + " OR ".join(clauses) + ")"
+
+
+def fuse_rankings(rankings: list, limit: int, k: int = SEARCH_CONFIG["rrf_k"]) -> list:
+    """
+    Reciprocal rank fusion: each row scores sum(1 / (k + rank)) over the
+    rankings it appears in. Rows are merged by id, so a chunk found by both
+    searches keeps its `_distance` and its BM25 `_score`.
+    """
+    scores, rows = {}, {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, 1):
+            scores[row["id"]] = scores.get(row["id"], 0.0) + 1.0 / (k + rank)
+            rows[row["id"]] = {**row, **rows.get(row["id"], {})}
+    ordered = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [{**rows[row_id], "_relevance_score": scores[row_id]} for row_id in ordered]
+
+
+def has_fts_index(table) -> bool:
+    return any(index.index_type == "FTS" for index in table.list_indices())
+
+
+class Retriever:
+    """
+    Holds an embedding model and an open `codebase` table for repeated queries.
+
+    Queries first check the table for a newer version, so a long-lived
+    retriever (the daemon) follows re-indexing instead of mixing embeddings.
+    """
+
+    def __init__(self, embedder, table):
+        # None defers loading the model until a query needs an embedding (lexical hits never do).
+        self._embedder = embedder
+        self.table = table
+        self._encode_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._version = None
+        self._signature = None
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Re-reads the index's embedding spec, vector width and full-text index
+        when the table has moved to a new version. A changed spec or width
+        drops the loaded model; the next embedding loads the recorded one.
+        """
+        version = self.table.version
+        if version == self._version:
+            return
+        with self._refresh_lock:
+            if version == self._version:
+                return
+            signature = (table_spec(self.table), self.table.schema.field("vector").type.list_size)
+            if self._signature is not None and signature != self._signature:
+                with self._encode_lock:
+                    self._embedder = None
+            self._signature = signature
+            # Indexes built before the full-text index existed fall back to vector search.
+            self.lexical = has_fts_index(self.table)
+            self._version = version
+
+    @property
+    def embedder(self):
+        # Only read under _encode_lock, so the model is loaded at most once.
+        if self._embedder is None:
+            self._embedder = load_index_embedder(self.table)
+        return self._embedder
+
+    def embed(self, query: str):
+        with self._encode_lock, metrics.span("retrieval.embed"):
+            return self.embedder.encode(query)
+
+    def search_vector(self, vector, limit: int = 3, nprobes: int = DEFAULT_NPROBES, exact: bool = False, where: str | None = None) -> list:
+        """Nearest chunks to an embedding; exact=True skips the ANN index (for recall checks)."""
+        query = self.table.search(vector).limit(limit)
+        query = query.bypass_vector_index() if exact else query.nprobes(nprobes)
+        if where:
+            # Filter first so the scan only visits matching paths and still returns `limit` rows.
+            query = query.where(where, prefilter=True)
+        with metrics.span("retrieval.search"):
+            results = query.to_list()
+        for result in results:
+            result.pop("vector", None)
+        return results
+
+    def search_lexical(self, query: str, limit: int = 3, where: str | None = None) -> list:
+        """BM25 matches from the full-text index; no embedding needed."""
+        fetch = max(limit, SEARCH_CONFIG["candidates"]) if is_identifier_query(query) else limit
+        search = self.table.search(query, query_type="fts").limit(fetch)
+        if where:
+            search = search.where(where, prefilter=True)
+        with metrics.span("retrieval.lexical"):
+            results = search.to_list()
+        for result in results:
+            result.pop("vector", None)
+        if fetch > limit:
+            # The index splits identifiers into words; put chunks containing them verbatim first.
+            terms = code_terms(query)
+            results.sort(key=lambda result: not all(term in result["text"] for term in terms))
+        return results[:limit]
+
+    def search_hybrid(self, query: str, vector, limit: int = 3, nprobes: int = DEFAULT_NPROBES, where: str | None = None) -> list:
+        """Fuses vector and BM25 rankings with reciprocal rank fusion."""
+        candidates = max(limit, SEARCH_CONFIG["candidates"])
+        return fuse_rankings([
+            self.search_vector(vector, candidates, nprobes, where=where),
+            self.search_lexical(query, candidates, where),
+        ], limit)
+
+    def search(self, query: str, limit: int = 3, nprobes: int = DEFAULT_NPROBES, mode: str = SEARCH_CONFIG["mode"], paths: list | None = None) -> list:
+        """
+        Top chunks for a query. Identifier queries in "auto" mode are answered
+        from the BM25 index alone (falling back to hybrid when it finds nothing);
+        `paths` globs restrict every search to matching files.
+        """
+        self.refresh()
+        where = path_filter(paths)
+        resolved = resolve_mode(query, mode, self.lexical)
+        if resolved == "lexical":
+            results = self.search_lexical(query, limit, where)
+            if results or mode == "lexical":
+                return results
+            resolved = "hybrid"
+        vector = self.embed(query)
+        if resolved == "vector":
+            return self.search_vector(vector, limit, nprobes, where=where)
+        return self.search_hybrid(query, vector, limit, nprobes, where)
+
+    def embed_many(self, queries: list):
+        """Encodes several queries in one model call."""
+        self.refresh()
+        with self._encode_lock, metrics.span("retrieval.embed"):
+            return self.embedder.encode(queries)
+
+    def search_vectors(self, vectors, limit: int = 3, nprobes: int = DEFAULT_NPROBES) -> list:
+        """Nearest chunks for each of several embeddings, in one multi-vector search."""
+        query = self.table.search(vectors).limit(limit).nprobes(nprobes)
+        with metrics.span("retrieval.search"):
+            rows = query.to_list()
+        grouped = [[] for _ in range(len(vectors))]
+        for row in rows:
+            row.pop("vector", None)
+            grouped[row.pop("query_index", 0)].append(row)
+        return grouped
+
+    def search_many(self, queries: list, limit: int = 3, nprobes: int = DEFAULT_NPROBES) -> list:
+        return self.search_vectors(self.embed_many(queries), limit, nprobes)
+
+
+def open_table(db_path: str = DB_PATH, **connect_kwargs):
+    if not os.path.exists(db_path):
+        raise IndexNotFoundError("No index found. Please run 'adept index create' first.")
+    import lancedb
+    db = lancedb.connect(db_path, **connect_kwargs)
+    if TABLE_NAME not in db.table_names():
+        raise IndexNotFoundError("No codebase table found in index.")
+    return db.open_table(TABLE_NAME)
+
+
+def load_index_embedder(table):
+    """Loads the model and backend recorded in the table, so queries embed the way the index did."""
+    embedder = load_embedder(table_spec(table))
+    dimension = getattr(embedder, "get_sentence_embedding_dimension", lambda: None)()
+    if dimension and dimension != table.schema.field("vector").type.list_size:
+        raise IndexNotFoundError("The index was built with a different embedding model. Please run 'adept index create --full'.")
+    return embedder
+
+
+def open_retriever(db_path: str = DB_PATH, lazy: bool = False, **connect_kwargs) -> Retriever:
+    """Loads the embedding model and opens the index in-process (the cold path); lazy=True defers the model to the first embedding."""
+    table = open_table(db_path, **connect_kwargs)
+    return Retriever(None if lazy else load_index_embedder(table), table)
+
+
+def build_context_prompt(task: str, results: list) -> str:
+    """Prepends retrieved chunks to a task, each labelled with its path and line range."""
+    context_parts = []
+    for result in results:
+        location = result['path']
+        if result.get('start_line'):
+            location += f":{result['start_line']}-{result['end_line']}"
+        context_parts.append(f"--- CONTEXT FROM {location} ---\n{result['text']}\n--- END CONTEXT ---")
+    context_string = "\n\n".join(context_parts)
+    return f"{context_string}\n\nNow, based on the above context, please address the following task:\n{task}"
@@ -0,0 +1,121 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from adept.core.config import SESSION_CONFIG
+from adept.core.engine import convert_history
+
+
+@dataclass
+class Session:
+    """One conversation, with its history kept in the provider's native message format."""
+    id: str
+    provider: str
+    messages: list = field(default_factory=list)
+    # Number of messages already written to SQLite; 0 means rewrite the session from scratch.
+    persisted: int = 0
+
+    def for_provider(self, provider: str) -> "Session":
+        """Returns this session in another provider's format (translated once, not per turn)."""
+        if provider == self.provider:
+            return self
+        source = "groq" if self.provider == "groq" else "gemini"
+        target = "groq" if provider == "groq" else "gemini"
+        return Session(self.id, provider, convert_history(self.messages, source, target))
+
+
+class SessionStore:
+    """
+    Keeps chat sessions server-side so clients only send the new message.
+
+    Recent sessions live in an in-memory LRU. With db_path set, every turn is
+    also appended to SQLite, so evicted sessions and restarts lose nothing.
+    """
+
+    def __init__(self, max_sessions: int = 1000, db_path: str | None = None):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, provider TEXT NOT NULL, updated_at REAL NOT NULL);
+                CREATE TABLE IF NOT EXISTS messages (
+                    session_id TEXT NOT NULL, seq INTEGER NOT NULL, body TEXT NOT NULL,
+                    PRIMARY KEY (session_id, seq)
+                );
+                """
+            )
+
+    @property
+    def persistent(self) -> bool:
+        """True when sessions are written to SQLite (calls then do disk I/O)."""
+        return self._db is not None
+
+    def get(self, session_id: str, provider: str) -> Session:
+        """Returns the session (creating an empty one if unknown), in the given provider's format."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            else:
+                session = self._load(session_id) or Session(session_id, provider)
+                self._remember(session)
+        return session.for_provider(provider)
+
+    def save(self, session: Session) -> None:
+        """Stores the session's latest history, appending only new messages to SQLite."""
+        with self._lock:
+            self._remember(session)
+            if self._db is None:
+                return
+            with self._db:
+                if session.persisted == 0:
+                    self._db.execute("DELETE FROM messages WHERE session_id = ?", (session.id,))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sessions (id, provider, updated_at) VALUES (?, ?, ?)",
+                    (session.id, session.provider, time.time()),
+                )
+                self._db.executemany(
+                    "INSERT INTO messages (session_id, seq, body) VALUES (?, ?, ?)",
+                    [(session.id, seq, json.dumps(message)) for seq, message in enumerate(session.messages[session.persisted:], session.persisted)],
+                )
+            session.persisted = len(session.messages)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                    self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, session: Session) -> None:
+        self._sessions[session.id] = session
+        self._sessions.move_to_end(session.id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def _load(self, session_id: str) -> Session | None:
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT provider FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        bodies = self._db.execute("SELECT body FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)).fetchall()
+        messages = [json.loads(body) for (body,) in bodies]
+        return Session(session_id, row[0], messages, persisted=len(messages))
+
+
+def open_session_store() -> SessionStore:
+    """Builds the store described by SESSION_CONFIG."""
+    return SessionStore(SESSION_CONFIG["max_sessions"], SESSION_CONFIG["db_path"])
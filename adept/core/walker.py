@@ -0,0 +1,152 @@
+import os
+import pathlib
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator
+
+from adept.core.manifest import hash_content
+
+
+class GitIgnore:
+    """Ordered gitignore rules collected from every .gitignore on the way down; last match wins."""
+
+    def __init__(self, rules: tuple = ()):
+        self.rules = rules
+
+    def extend(self, base: str, gitignore_path: str) -> "GitIgnore":
+        try:
+            with open(gitignore_path, "r", encoding="utf-8", errors="ignore") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return self
+
+        rules = list(self.rules)
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if not line:
+                continue
+            rules.append((base, re.compile(_glob_to_regex(line)), negate, dir_only, anchored))
+        return GitIgnore(tuple(rules))
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        ignored = False
+        for base, pattern, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not rel_path.startswith(base + "/"):
+                    continue
+                candidate = rel_path[len(base) + 1:]
+            else:
+                candidate = rel_path
+            if not anchored:
+                candidate = candidate.rsplit("/", 1)[-1]
+            if pattern.fullmatch(candidate):
+                ignored = not negate
+        return ignored
+
+
+def _glob_to_regex(pattern: str) -> str:
+    regex = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            regex.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            regex.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1:]:
+            end = pattern.index("]", i + 1)
+            regex.append("[" + pattern[i + 1:end].replace("!", "^", 1) + "]")
+            i = end + 1
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(regex)
+
+
+def iter_files(root: str, ignore_dirs: set, ignore_extensions: set, use_gitignore: bool = True) -> Iterator[pathlib.Path]:
+    """Yields indexable files under root without ever descending into ignored directories."""
+    stack = [("", GitIgnore())]
+    while stack:
+        rel_dir, gitignore = stack.pop()
+        abs_dir = os.path.join(root, rel_dir) if rel_dir else root
+        if use_gitignore:
+            gitignore_path = os.path.join(abs_dir, ".gitignore")
+            if os.path.isfile(gitignore_path):
+                gitignore = gitignore.extend(rel_dir, gitignore_path)
+
+        try:
+            with os.scandir(abs_dir) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in ignore_dirs and not gitignore.is_ignored(rel_path, True):
+                        subdirs.append(rel_path)
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if entry.name in ignore_dirs or os.path.splitext(entry.name)[1].lower() in ignore_extensions:
+                continue
+            if gitignore.is_ignored(rel_path, False):
+                continue
+            yield pathlib.Path(root) / rel_path
+
+        stack.extend((subdir, gitignore) for subdir in reversed(subdirs))
+
+
+def _read(path: pathlib.Path) -> tuple:
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        return raw, hash_content(raw), None
+    except Exception as e:
+        return None, None, e
+
+
+def read_files(items: Iterable[tuple], workers: int = 8, max_pending: int = 64) -> Iterator[tuple]:
+    """
+    Reads and hashes (path, stat) items on a thread pool.
+
+    At most max_pending reads are in flight, so this acts as a bounded queue between
+    disk I/O and the chunk/embed stage. Results are yielded in input order as
+    (path, stat, raw_bytes, content_hash, error).
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for path, stat in items:
+            in_flight.append((path, stat, executor.submit(_read, path)))
+            if len(in_flight) >= max_pending:
+                path, stat, future = in_flight.popleft()
+                yield (path, stat, *future.result())
+        while in_flight:
+            path, stat, future = in_flight.popleft()
+            yield (path, stat, *future.result())
@@ -1,24 +1,64 @@
+import importlib
 import typer
-from adept.commands import write, check, chain, index
+from typer.core import TyperGroup
 from adept.core.banner import print_banner
+from adept.core import metrics
+
+# Subcommand modules are imported only when invoked, so `adept --help` and light
+# commands never pay for lancedb / sentence-transformers / torch.
+SUBCOMMANDS = {
+    "write": ("adept.commands.write", "Run a single AI task against a provider."),
+    "check": ("adept.commands.check", "Check API access and list available models."),
+    "chain": ("adept.commands.chain", "Execute a numbered list of tasks, or a dependency graph from a chain file."),
+    "index": ("adept.commands.index", "Build, serve and query the local code index."),
+}
+
+
+class LazyGroup(TyperGroup):
+    """Lists subcommands from SUBCOMMANDS and imports a module only once its subcommand is resolved."""
+
+    def list_commands(self, ctx):
+        return list(SUBCOMMANDS) + [name for name in super().list_commands(ctx) if name not in SUBCOMMANDS]
+
+    def get_command(self, ctx, name):
+        if name not in SUBCOMMANDS:
+            return super().get_command(ctx, name)
+        # Lightweight stand-in used for help listings; resolve_command swaps in the real one.
+        return typer.core.TyperGroup(name=name, help=SUBCOMMANDS[name][1])
+
+    def resolve_command(self, ctx, args):
+        name, command, remaining = super().resolve_command(ctx, args)
+        if name in SUBCOMMANDS:
+            module = importlib.import_module(SUBCOMMANDS[name][0])
+            command = typer.main.get_group(module.app)
+            command.name = name
+        return name, command, remaining
+
 
 app = typer.Typer(
-    add_completion=False, 
+    cls=LazyGroup,
+    add_completion=False,
     help="Adept - The AI Engineer's Workflow Orchestrator"
 )
 
 
 @app.callback(invoke_without_command=True)
-def _root_callback(ctx: typer.Context) -> None:
+def _root_callback(
+    ctx: typer.Context,
+    profile: bool = typer.Option(False, "--profile", help="Print a per-stage timing and token-usage breakdown when the command finishes."),
+) -> None:
     print_banner()
+    if profile:
+        metrics.enable()
+        ctx.call_on_close(_print_profile)
     if ctx.invoked_subcommand is None:
-        typer.echo(app.get_help(ctx))
+        typer.echo(ctx.get_help())
         raise typer.Exit(0)
 
-app.add_typer(write.app, name="write")
-app.add_typer(check.app, name="check")
-app.add_typer(chain.app, name="chain")
-app.add_typer(index.app, name="index")
+def _print_profile() -> None:
+    from rich.console import Console
+    from adept.core.display import print_profile
+    print_profile(Console())
 
 if __name__ == "__main__":
     app()
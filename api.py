@@ -1,21 +1,134 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-from adept.core.engine import execute_task
+from adept.core.engine import execute_task_async, stream_task
+from adept.core.concurrency import ProviderBusyError
+from adept.core.http import close_clients, aclose_async_clients
+from adept.core.sessions import open_session_store
+from adept.core.config import DEFAULT_NPROBES
+from adept.core.retrieval import build_context_prompt, open_retriever
+from adept.core.batcher import SearchBatcher
+from adept.core import metrics
 
-app = FastAPI(title="Adept API")
+sessions = open_session_store()
+# session_id -> [lock, holders]. A turn holds its session's lock from reading the
+# history to saving the reply, so overlapping requests on one session queue up.
+_turn_locks = {}
+# Set at startup when a local index is available; backs /search and context-aware /chat.
+searcher = None
+# The API always records metrics so /metrics has something to scrape.
+metrics.enable()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global searcher
+    # Load the embedding model and open the index once, not per request.
+    try:
+        searcher = SearchBatcher(await asyncio.to_thread(open_retriever))
+    except Exception as e:
+        print(f"Retrieval disabled: {e}")
+    yield
+    if searcher is not None:
+        await searcher.close()
+    sessions.close()
+    # Provider clients are pooled for the life of the process; release their connections on shutdown.
+    await aclose_async_clients()
+    close_clients()
+
+app = FastAPI(title="Adept API", lifespan=lifespan)
 
 class ChatRequest(BaseModel):
     message: str
     provider: str = "groq"
     model: str = "default"
     conversation_history: list = []
+    # With a session_id the server keeps the history: send only the new message.
+    session_id: str | None = None
+    # Prepend the most relevant chunks from the local code index to the message.
+    context: bool = False
+    context_limit: int = 3
+
+class SearchRequest(BaseModel):
+    query: str
+    limit: int = 5
+    nprobes: int = DEFAULT_NPROBES
+
+async def _session_io(method, *args):
+    """Runs a session store call; with SQLite enabled, on a worker thread so commits never block the event loop."""
+    if sessions.persistent:
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+async def _session_turn(session_id: str | None):
+    """Waits for the session's previous turn to finish; returns an idempotent release function."""
+    if not session_id:
+        return lambda: None
+    entry = _turn_locks.setdefault(session_id, [asyncio.Lock(), 0])
+    entry[1] += 1
+
+    def forget():
+        entry[1] -= 1
+        if not entry[1]:
+            _turn_locks.pop(session_id, None)
+
+    try:
+        await entry[0].acquire()
+    except BaseException:
+        forget()
+        raise
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            entry[0].release()
+            forget()
+
+    return release
+
+def _require_searcher() -> SearchBatcher:
+    if searcher is None:
+        raise HTTPException(status_code=503, detail="No code index is loaded. Run `adept index create` and restart the API.")
+    return searcher
+
+async def _task_for(request: ChatRequest) -> str:
+    if not request.context:
+        return request.message
+    results = await _require_searcher().search(request.message, limit=request.context_limit)
+    return build_context_prompt(request.message, results) if results else request.message
+
+@app.post("/search")
+async def search_endpoint(request: SearchRequest):
+    """Retrieves the code chunks closest to a query; concurrent queries are embedded and searched in batches."""
+    results = await _require_searcher().search(request.query, limit=request.limit, nprobes=request.nprobes)
+    return {"results": [{**row, "_distance": float(row.get("_distance", 0.0))} for row in results]}
 
 @app.post("/chat")
-def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest):
     """Handle conversational AI requests with memory for multiple providers."""
+    task = await _task_for(request)
+    release = await _session_turn(request.session_id)
     try:
-        response, updated_history = execute_task(
-            task=request.message,
+        if request.session_id:
+            session = await _session_io(sessions.get, request.session_id, request.provider)
+            response, session.messages = await execute_task_async(
+                task=task,
+                provider=request.provider,
+                model=request.model,
+                conversation_history=session.messages,
+                native=True
+            )
+            await _session_io(sessions.save, session)
+            return {"status": "success", "response": response, "session_id": session.id}
+
+        response, updated_history = await execute_task_async(
+            task=task,
             provider=request.provider,
             model=request.model,
             conversation_history=request.conversation_history
@@ -25,6 +138,81 @@ def chat_endpoint(request: ChatRequest):
             "response": response,
             "conversation_history": updated_history
         }
+    except ProviderBusyError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         print(f"API Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        release()
+
+def _sse(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Streams the reply as server-sent events.
+
+    Each token arrives as `data: {"delta": ...}`; a final `event: done` carries the
+    full response, time_to_first_token and either the session_id or, without a
+    session, the updated conversation_history.
+    """
+    task = await _task_for(request)
+    # Held until the reply is saved at the end of the stream (or the stream fails).
+    release = await _session_turn(request.session_id)
+    try:
+        session = await _session_io(sessions.get, request.session_id, request.provider) if request.session_id else None
+        stream = stream_task(
+            task=task,
+            provider=request.provider,
+            model=request.model,
+            conversation_history=session.messages if session else request.conversation_history,
+            native=session is not None
+        )
+        deltas = stream.__aiter__()
+        # Wait for the first token before responding, so saturation and provider
+        # errors still surface as proper HTTP status codes.
+        first = await anext(deltas, None)
+    except ProviderBusyError as e:
+        release()
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        release()
+        print(f"API Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def events():
+        try:
+            if first is not None:
+                yield _sse({"delta": first})
+            async for delta in deltas:
+                yield _sse({"delta": delta})
+            done = {"status": "success", "response": stream.text, "time_to_first_token": stream.time_to_first_token}
+            if session:
+                session.messages = stream.history
+                await _session_io(sessions.save, session)
+                done["session_id"] = session.id
+            else:
+                done["conversation_history"] = stream.history
+            yield _sse(done, event="done")
+        except Exception as e:
+            print(f"API Error: {e}")
+            yield _sse({"detail": str(e)}, event="error")
+        finally:
+            release()
+
+    # The background task covers a client that disconnects before the body is iterated.
+    return StreamingResponse(events(), media_type="text/event-stream", background=BackgroundTask(release))
+
+@app.delete("/sessions/{session_id}", status_code=204)
+async def delete_session(session_id: str):
+    """Forget a server-side conversation."""
+    await _session_io(sessions.delete, session_id)
+    return Response(status_code=204)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Stage timings and token usage in the Prometheus text format."""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,276 @@
+"""
+Offline load benchmark for Adept's own overhead.
+
+Starts benchmarks/mock_provider.py on a local port, points Adept at it, and
+drives execute_task, `chain execute`, the FastAPI /chat endpoint, and
+`index create` plus retrieval (vector, hybrid, identifier lookups and
+micro-batched) on a synthetic repository. Reports throughput and p50/p95/p99 latency per scenario, and
+writes JSON that --compare can diff against a previous run.
+
+    python benchmarks/load.py --requests 500 --concurrency 32 --output bench.json
+    python benchmarks/load.py --scenarios engine,api --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCENARIOS = ["engine", "chain", "api", "index"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(ordered: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def summarize(latencies: list, errors: int, wall: float) -> dict:
+    """Throughput and latency percentiles (milliseconds) for one scenario."""
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"count": 0, "errors": errors}
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "throughput_per_s": round(len(ordered) / wall, 2) if wall else None,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+    }
+
+
+def run_threads(call, count: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+
+    def timed(i):
+        started = time.perf_counter()
+        call(i)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(timed, i) for i in range(count)]:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def bench_engine(args) -> dict:
+    from adept.core.engine import execute_task
+
+    results = {}
+    for provider in ("groq", "gemini"):
+        results[f"engine:{provider}"] = run_threads(
+            lambda i: execute_task(f"benchmark request {i}", provider, "default"),
+            args.requests, args.concurrency,
+        )
+    return results
+
+
+def bench_chain(args, env: dict) -> dict:
+    # Full CLI invocations, so this includes interpreter and import time.
+    tasks = " ".join(f"{i}. Step {i} of the benchmark chain." for i in range(1, args.chain_steps + 1))
+    command = [sys.executable, "-m", "adept.main", "chain", "execute", tasks, "-p", "groq", "--no-stream", "--no-cache"]
+    return {"chain": run_threads(
+        lambda i: subprocess.run(command, cwd=REPO_ROOT, env=env, check=True, capture_output=True),
+        args.chain_runs, 1,
+    )}
+
+
+def bench_api(args) -> dict:
+    import httpx
+    import api
+
+    async def drive() -> dict:
+        latencies, errors = [], 0
+        semaphore = asyncio.Semaphore(args.concurrency)
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://adept", timeout=60) as client:
+            async def one(i: int) -> None:
+                nonlocal errors
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post("/chat", json={"message": f"benchmark {i}", "session_id": f"bench-{i % args.concurrency}"})
+                    if response.status_code == 200:
+                        latencies.append(time.perf_counter() - started)
+                    else:
+                        errors += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(args.requests)))
+            wall = time.perf_counter() - started
+        from adept.core.http import aclose_async_clients
+        await aclose_async_clients()
+        return summarize(latencies, errors, wall)
+
+    return {"api:/chat": asyncio.run(drive())}
+
+
+def make_repo(root: Path, files: int, functions: int) -> None:
+    """Writes a synthetic Python package of `files` modules with `functions` functions each."""
+    rng = random.Random(0)
+    words = "load parse index embed search rank chunk stream cache retry batch plan".split()
+    for f in range(files):
+        package = root / f"pkg{f % 10}"
+        package.mkdir(exist_ok=True)
+        body = []
+        for n in range(functions):
+            name = f"{rng.choice(words)}_{rng.choice(words)}_{n}"
+            body.append(f"def {name}(items, limit={n}):\n    \"\"\"{rng.choice(words)} {rng.choice(words)} helper.\"\"\"\n"
+                        f"    result = [item for item in items if item][:limit]\n    return sorted(result)\n")
+        (package / f"module{f}.py").write_text("\n\n".join(body))
+
+
+def bench_index(args, env: dict) -> dict:
+    try:
+        import sentence_transformers  # noqa: F401
+    except ImportError:
+        return {"index": {"skipped": "sentence-transformers is not installed"}}
+
+    workdir = Path(tempfile.mkdtemp(prefix="adept-bench-"))
+    try:
+        make_repo(workdir, args.repo_files, args.repo_functions)
+        command = [sys.executable, "-m", "adept.main", "index", "create"]
+        results = {}
+        started = time.perf_counter()
+        subprocess.run([*command, "--full"], cwd=workdir, env=env, check=True, capture_output=True)
+        results["index:create"] = summarize([time.perf_counter() - started], 0, time.perf_counter() - started)
+
+        for path in sorted(workdir.rglob("*.py"))[: max(1, args.repo_files // 20)]:
+            path.write_text(path.read_text() + "\n\ndef touched():\n    return 1\n")
+        started = time.perf_counter()
+        subprocess.run(command, cwd=workdir, env=env, check=True, capture_output=True)
+        results["index:incremental"] = summarize([time.perf_counter() - started], 0, time.perf_counter() - started)
+
+        from adept.core.retrieval import open_retriever
+
+        retriever = open_retriever(db_path=str(workdir / ".adept_db"))
+        queries = [f"where do we {word} items" for word in "load parse index embed search rank chunk stream".split()]
+        results["retrieval"] = run_threads(lambda i: retriever.search(queries[i % len(queries)], limit=5, mode="vector"), args.queries, 1)
+        results["retrieval:hybrid"] = run_threads(lambda i: retriever.search(queries[i % len(queries)], limit=5, mode="hybrid"), args.queries, 1)
+        # Function names from make_repo; "auto" answers these from the full-text index without embedding.
+        identifiers = [f"{word}_{word}_{n}" for n, word in enumerate("load parse index embed search rank chunk stream".split())]
+        results["retrieval:identifier"] = run_threads(lambda i: retriever.search(identifiers[i % len(identifiers)], limit=5, mode="auto"), args.queries, 1)
+        results["retrieval:batched"] = asyncio.run(bench_batched_search(retriever, queries, args))
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+async def bench_batched_search(retriever, queries: list, args) -> dict:
+    """The API's /search path: concurrent queries coalesced by SearchBatcher."""
+    from adept.core.batcher import SearchBatcher
+
+    batcher = SearchBatcher(retriever)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await batcher.search(queries[i % len(queries)], limit=5)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.queries)))
+    wall = time.perf_counter() - started
+    await batcher.close()
+    return summarize(latencies, 0, wall)
+
+
+def compare(current: dict, baseline: dict) -> None:
+    print(f"\n{'scenario':<20} {'metric':<8} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or "p50_ms" not in result or "p50_ms" not in before:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            change = (result[metric] - before[metric]) / before[metric] * 100 if before[metric] else 0.0
+            print(f"{name:<20} {metric[:-3]:<8} {before[metric]:>10.1f} {result[metric]:>10.1f} {change:>+7.1f}%")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated subset of {', '.join(SCENARIOS)}.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per engine/API scenario.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent requests for engine/API scenarios.")
+    parser.add_argument("--chain-runs", type=int, default=5, help="`chain execute` invocations.")
+    parser.add_argument("--chain-steps", type=int, default=3, help="Steps per chain.")
+    parser.add_argument("--repo-files", type=int, default=200, help="Modules in the synthetic repository.")
+    parser.add_argument("--repo-functions", type=int, default=20, help="Functions per synthetic module.")
+    parser.add_argument("--queries", type=int, default=50, help="Retrieval queries against the synthetic index.")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Mock provider latency.")
+    parser.add_argument("--jitter-ms", type=float, default=10, help="Mock provider latency jitter.")
+    parser.add_argument("--reply-words", type=int, default=100, help="Mock reply size in words.")
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    parser.add_argument("--compare", help="Print percentile changes against a previous --output file.")
+    args = parser.parse_args()
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    # Must be set before adept.core.config is imported, here and in the CLI subprocesses.
+    overrides = {
+        "ADEPT_GEMINI_BASE_URL": base_url,
+        "ADEPT_GROQ_BASE_URL": base_url,
+        "GEMINI_API_KEY": "mock",
+        "GROQ_API_KEY": "mock",
+        "ADEPT_CACHE": "0",
+    }
+    os.environ.update(overrides)
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")]))}
+    sys.path.insert(0, str(REPO_ROOT))
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from mock_provider import create_app, start_in_thread
+
+    server = start_in_thread(create_app(args.latency_ms, args.jitter_ms, args.reply_words), port)
+    results = {}
+    try:
+        if "engine" in scenarios:
+            results.update(bench_engine(args))
+        if "chain" in scenarios:
+            results.update(bench_chain(args, env))
+        if "api" in scenarios:
+            results.update(bench_api(args))
+        if "index" in scenarios:
+            results.update(bench_index(args, env))
+    finally:
+        server.should_exit = True
+
+    report = {
+        "python": platform.python_version(),
+        "git": subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    if args.compare:
+        compare(report, json.loads(Path(args.compare).read_text()))
+    return 1 if any(result.get("errors") for result in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Local stand-in for the Gemini and Groq APIs.
+
+Speaks Gemini `generateContent` / `streamGenerateContent` (alt=sse) and Groq
+chat completions (plain and streamed), including usage fields and Groq-style
+rate-limit headers, with configurable latency and reply size. Point Adept at
+it with:
+
+    python benchmarks/mock_provider.py --port 8765 --latency-ms 50 --reply-words 200
+    ADEPT_GEMINI_BASE_URL=http://127.0.0.1:8765 ADEPT_GROQ_BASE_URL=http://127.0.0.1:8765 \\
+        GEMINI_API_KEY=mock GROQ_API_KEY=mock python -m adept.main write execute "hello"
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = "the quick brown fox jumps over a lazy dog while adept streams tokens".split()
+
+
+def create_app(latency_ms: float = 50, jitter_ms: float = 10, reply_words: int = 100, stream_chunks: int = 10) -> FastAPI:
+    """Builds the mock app; every reply waits latency_ms ± jitter_ms and contains reply_words words."""
+    app = FastAPI(title="Adept mock provider")
+    reply = " ".join(WORDS[i % len(WORDS)] for i in range(reply_words))
+    chunk_size = max(1, len(reply) // max(1, stream_chunks))
+    chunks = [reply[i:i + chunk_size] for i in range(0, len(reply), chunk_size)]
+    headers = {
+        "x-ratelimit-limit-tokens": "1000000",
+        "x-ratelimit-remaining-tokens": "999000",
+        "x-ratelimit-reset-tokens": "1s",
+        "x-ratelimit-remaining-requests": "100000",
+        "x-ratelimit-reset-requests": "1s",
+    }
+
+    async def delay(fraction: float = 1.0) -> None:
+        await asyncio.sleep(max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) * fraction / 1000)
+
+    def usage(prompt: str) -> tuple[int, int]:
+        return max(1, len(prompt) // 4), max(1, len(reply) // 4)
+
+    @app.post("/v1/models/{model_action}")
+    async def gemini(model_action: str, request: Request):
+        body = await request.json()
+        prompt = json.dumps(body.get("contents", []))
+        prompt_tokens, reply_tokens = usage(prompt)
+        meta = {"promptTokenCount": prompt_tokens, "candidatesTokenCount": reply_tokens, "totalTokenCount": prompt_tokens + reply_tokens}
+
+        if model_action.endswith(":streamGenerateContent"):
+            async def events():
+                await delay(0.5)
+                for chunk in chunks:
+                    yield f"data: {json.dumps({'candidates': [{'content': {'parts': [{'text': chunk}], 'role': 'model'}}]})}\r\n\r\n"
+                    await delay(0.5 / len(chunks))
+                yield f"data: {json.dumps({'candidates': [{'content': {'parts': [{'text': ''}], 'role': 'model'}}], 'usageMetadata': meta})}\r\n\r\n"
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await delay()
+        return JSONResponse({"candidates": [{"content": {"parts": [{"text": reply}], "role": "model"}}], "usageMetadata": meta})
+
+    @app.post("/openai/v1/chat/completions")
+    async def groq(request: Request):
+        body = await request.json()
+        prompt_tokens, reply_tokens = usage(json.dumps(body.get("messages", [])))
+        usage_block = {"prompt_tokens": prompt_tokens, "completion_tokens": reply_tokens, "total_tokens": prompt_tokens + reply_tokens}
+
+        if body.get("stream"):
+            async def events():
+                await delay(0.5)
+                for chunk in chunks:
+                    yield f"data: {json.dumps({'choices': [{'delta': {'content': chunk}}]})}\n\n"
+                    await delay(0.5 / len(chunks))
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+        await delay()
+        return JSONResponse({"choices": [{"message": {"role": "assistant", "content": reply}}], "usage": usage_block}, headers=headers)
+
+    @app.get("/v1/models")
+    @app.get("/openai/v1/models")
+    async def models():
+        return {"models": [{"name": "models/mock", "displayName": "Mock"}], "data": [{"id": "mock", "owned_by": "mock"}]}
+
+    return app
+
+
+def start_in_thread(app: FastAPI, port: int, host: str = "127.0.0.1"):
+    """Runs the app with uvicorn on a daemon thread; returns the server once it accepts connections."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError(f"Mock provider failed to start on {host}:{port}")
+        time.sleep(0.02)
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50, help="Mean time before each reply.")
+    parser.add_argument("--jitter-ms", type=float, default=10, help="Uniform jitter added to the latency.")
+    parser.add_argument("--reply-words", type=int, default=100, help="Reply size in words.")
+    parser.add_argument("--stream-chunks", type=int, default=10, help="Deltas per streamed reply.")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(args.latency_ms, args.jitter_ms, args.reply_words, args.stream_chunks)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+CLI startup-time guard.
+
+Runs lightweight Adept commands in fresh interpreters and fails if the median
+wall time exceeds the budget, so heavy imports (lancedb, sentence-transformers,
+torch) can't creep back onto the startup path unnoticed.
+
+    python benchmarks/startup.py --runs 10 --max-seconds 0.75
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+COMMANDS = [
+    ["--help"],
+    ["check", "--help"],
+    ["check", "models", "--help"],
+    ["write", "execute", "--help"],
+    ["write", "batch", "--help"],
+    ["chain", "execute", "--help"],
+    ["chain", "run", "--help"],
+    ["index", "--help"],
+]
+
+# Modules that must never be imported just to render help for the commands above.
+FORBIDDEN_MODULES = ["lancedb", "sentence_transformers", "torch"]
+
+
+def time_command(args: list, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "adept.main", *args], cwd=REPO_ROOT, check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def leaked_modules(args: list) -> list:
+    probe = (
+        "import sys, runpy\n"
+        f"sys.argv = ['adept', *{args!r}]\n"
+        "try:\n"
+        "    runpy.run_module('adept.main', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"sys.stderr.write('LEAKED:' + ','.join(m for m in {FORBIDDEN_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], cwd=REPO_ROOT, check=True, capture_output=True, text=True)
+    leaked = result.stderr.rsplit("LEAKED:", 1)[-1].strip()
+    return [name for name in leaked.split(",") if name]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command (median is reported).")
+    parser.add_argument("--max-seconds", type=float, default=0.75, help="Budget for the median startup time.")
+    args = parser.parse_args()
+
+    failed = False
+    for command in COMMANDS:
+        median = statistics.median(time_command(command, args.runs))
+        leaked = leaked_modules(command)
+        status = "ok"
+        if median > args.max_seconds:
+            status = f"SLOW (> {args.max_seconds:.2f}s)"
+            failed = True
+        if leaked:
+            status = f"IMPORTS {', '.join(leaked)}"
+            failed = True
+        print(f"adept {' '.join(command):<28} {median * 1000:8.1f} ms  {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
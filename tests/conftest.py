@@ -0,0 +1,10 @@
+import pytest
+from adept.core import resilience
+
+
+@pytest.fixture(autouse=True)
+def latency_store(monkeypatch, tmp_path):
+    """Keeps latency samples from leaking into ./.adept_db or between tests."""
+    monkeypatch.setitem(resilience.RESILIENCE_CONFIG, "latency_path", str(tmp_path / "latency.sqlite"))
+    monkeypatch.setattr(resilience, "_latency_store", None)
+    monkeypatch.setattr(resilience, "_latencies", {})
@@ -0,0 +1,55 @@
+import asyncio
+import httpx
+import pytest
+import api
+from adept.core.sessions import SessionStore
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    store = SessionStore(db_path=str(tmp_path / "sessions.sqlite"))
+    monkeypatch.setattr(api, "sessions", store)
+
+    async def slow_reply(task, provider, model, conversation_history=None, native=False):
+        await asyncio.sleep(0.05)
+        return f"re: {task}", [*conversation_history, {"role": "user", "content": task}, {"role": "assistant", "content": f"re: {task}"}]
+
+    monkeypatch.setattr(api, "execute_task_async", slow_reply)
+    yield store
+    store.close()
+
+
+def test_overlapping_turns_on_one_session_are_both_kept(store):
+    async def drive():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://adept") as client:
+            return await asyncio.gather(*(
+                client.post("/chat", json={"message": message, "session_id": "shared"}) for message in ("one", "two")
+            ))
+
+    assert [response.status_code for response in asyncio.run(drive())] == [200, 200]
+    in_memory = store.get("shared", "groq").messages
+    assert [message["content"] for message in in_memory if message["role"] == "user"] == ["one", "two"]
+
+    # Reloading from SQLite (as after eviction or a restart) gives the same history.
+    store._sessions.clear()
+    assert store.get("shared", "groq").messages == in_memory
+    assert not api._turn_locks
+
+
+def test_persistent_session_io_runs_off_the_event_loop(store, monkeypatch):
+    import threading
+    threads = []
+    save = store.save
+
+    def recording_save(session):
+        threads.append(threading.current_thread())
+        save(session)
+
+    monkeypatch.setattr(store, "save", recording_save)
+
+    async def drive():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://adept") as client:
+            return await client.post("/chat", json={"message": "one", "session_id": "offloaded"})
+
+    assert asyncio.run(drive()).status_code == 200
+    assert threads and threads[0] is not threading.main_thread()
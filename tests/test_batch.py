@@ -0,0 +1,57 @@
+import httpx
+import pytest
+from adept.commands.write import load_batch
+from adept.core import engine, ratelimit, resilience
+
+
+def _write(tmp_path, text: str) -> str:
+    path = tmp_path / "tasks.jsonl"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_load_batch_accepts_strings_and_objects(tmp_path):
+    jobs = load_batch(_write(tmp_path, '"first"\n\n{"id": 7, "task": "second", "provider": "gemini"}\n'))
+
+    assert jobs == [{"task": "first", "id": "1"}, {"id": "7", "task": "second", "provider": "gemini"}]
+
+
+@pytest.mark.parametrize("line", ['{"id": "x"}', "[1, 2]", "42", '{"task": ""}', '{"task": "t", "model": 3}', "{not json"])
+def test_load_batch_names_the_bad_line(tmp_path, line):
+    with pytest.raises(ValueError, match="line 2"):
+        load_batch(_write(tmp_path, f'"ok"\n{line}\n"also ok"\n'))
+
+
+def test_each_retry_takes_quota_and_429s_reach_on_response(monkeypatch):
+    statuses = iter([429, 200])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = next(statuses)
+        if status == 429:
+            return httpx.Response(429, headers={"retry-after": "2"})
+        return httpx.Response(200, json={"choices": [{"message": {"role": "assistant", "content": "ok"}}]})
+
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    monkeypatch.setattr(engine, "get_client", lambda provider: httpx.Client(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(resilience.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(resilience, "_breakers", {})
+    sent, seen = [], []
+    text, _ = engine.execute_task(
+        "task", "groq", "default", before_send=sent.append,
+        on_response=lambda request, response, result: seen.append((response.status_code, result is None)),
+    )
+
+    assert text == "ok"
+    assert len(sent) == 2
+    assert seen == [(429, True), (200, False)]
+
+
+def test_a_429_pauses_the_limiter_for_retry_after(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    limiter = ratelimit.ProviderRateLimiter("test", requests_per_minute=60, tokens_per_minute=6000)
+    limiter.acquire(100)
+    limiter.observe({"retry-after": "3"}, 100, 0, status_code=429)
+
+    assert limiter.requests.wait_time(1, now[0]) == 3.0
+    assert limiter.tokens.level == 6000
@@ -0,0 +1,102 @@
+import json
+import httpx
+import pytest
+from adept.core import engine
+from adept.core.cache import ResponseCache
+
+REPLY = "cached reply"
+
+
+@pytest.fixture
+def provider(monkeypatch, tmp_path):
+    """A fake Groq endpoint plus a fresh on-disk cache; returns the list of requests it received."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        calls.append(body)
+        if body.get("stream"):
+            events = f"data: {json.dumps({'choices': [{'delta': {'content': REPLY}}]})}\n\ndata: [DONE]\n\n"
+            return httpx.Response(200, text=events, headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json={"choices": [{"message": {"role": "assistant", "content": REPLY}}]})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=3600, max_entries=100)
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    monkeypatch.setattr(engine, "get_client", lambda provider: client)
+    monkeypatch.setattr(engine, "get_cache", lambda: cache)
+    yield calls, cache
+    client.close()
+
+
+def _stream(task: str) -> engine.TaskStream:
+    stream = engine.stream_task(task, "groq", "default", cache=True)
+    assert "".join(stream) == REPLY
+    return stream
+
+
+def test_streamed_rerun_is_a_cache_hit(provider):
+    calls, cache = provider
+    _stream("same task")
+    second = _stream("same task")
+
+    assert len(calls) == 1
+    assert second.cached
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.usefixtures("provider")
+def test_cached_history_matches_a_live_reply():
+    live = _stream("same task")
+    cached = _stream("same task")
+
+    assert cached.history == live.history
+    assert cached.history[-1] == {"role": "model", "parts": [{"text": REPLY}]}
+
+
+def test_non_streamed_rerun_is_a_cache_hit(provider):
+    calls, cache = provider
+    first = engine.execute_task("same task", "groq", "default", cache=True)
+    second = engine.execute_task("same task", "groq", "default", cache=True)
+
+    assert len(calls) == 1
+    assert second == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_streamed_and_non_streamed_share_an_entry(provider):
+    calls, _ = provider
+    engine.execute_task("same task", "groq", "default", cache=True)
+
+    assert _stream("same task").cached
+    assert len(calls) == 1
+
+
+def test_before_send_is_skipped_on_a_cache_hit(provider):
+    sent = []
+    for _ in range(2):
+        engine.execute_task("same task", "groq", "default", cache=True, before_send=sent.append)
+
+    assert len(sent) == 1
+
+
+def test_cache_stats_do_not_create_the_cache(monkeypatch, tmp_path):
+    from rich.console import Console
+    from adept.core import cache as cache_module
+    from adept.core.display import print_cache_stats
+
+    path = tmp_path / "db" / "response_cache.sqlite"
+    monkeypatch.setattr(cache_module, "_cache", None)
+    monkeypatch.setitem(cache_module.CACHE_CONFIG, "path", str(path))
+    print_cache_stats(Console(file=None, quiet=True))
+
+    assert not path.exists()
+    assert not path.parent.exists()
+
+
+def test_uncached_requests_are_not_keyed(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    monkeypatch.setattr(engine, "cache_key", lambda request: pytest.fail("keyed without a cache"))
+
+    assert "cache_key" not in engine.prepare_request("task", "groq", "default")
+    assert engine.stream_task("task", "groq", "default").cache is None
@@ -0,0 +1,89 @@
+import json
+import hashlib
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+from adept.commands import index
+
+
+class FakeEmbedder:
+    max_seq_length = 256
+
+    def get_sentence_embedding_dimension(self):
+        return 8
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        return np.array([np.frombuffer(hashlib.sha256(text.encode()).digest()[:8], dtype=np.uint8) / 255 for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def repo(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(index, "load_embedder", lambda spec=None: FakeEmbedder())
+    (tmp_path / "a.py").write_text("def a():\n    return 1\n")
+    (tmp_path / "b.py").write_text("def b():\n    return 2\n")
+    return tmp_path
+
+
+def _create(*args):
+    result = CliRunner().invoke(index.app, ["create", *args])
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+def _indexed_paths() -> set:
+    import lancedb
+    table = lancedb.connect(index.DB_PATH).open_table(index.TABLE_NAME)
+    return {row["path"] for row in table.search().limit(None).select(["path"]).to_list()}
+
+
+def _manifest() -> dict:
+    with open(f"{index.DB_PATH}/manifest.json", encoding="utf-8") as f:
+        return json.load(f)["files"]
+
+
+def test_failed_file_keeps_its_rows_and_is_cleaned_up_later(repo, monkeypatch):
+    _create()
+    assert _indexed_paths() == {"a.py", "b.py"}
+
+    chunk_text = index.chunk_text
+
+    def failing_chunk_text(content, path, *args):
+        if path == "a.py":
+            raise RuntimeError("boom")
+        return chunk_text(content, path, *args)
+
+    (repo / "a.py").write_text("def a():\n    return 10\n")
+    monkeypatch.setattr(index, "chunk_text", failing_chunk_text)
+    assert "Could not process a.py" in _create()
+    # The old rows stay and the manifest still tracks the file, marked for a retry.
+    assert _indexed_paths() == {"a.py", "b.py"}
+    assert _manifest()["a.py"]["mtime"] is None
+
+    monkeypatch.setattr(index, "chunk_text", chunk_text)
+    (repo / "a.py").unlink()
+    _create()
+    assert _indexed_paths() == {"b.py"}
+    assert "a.py" not in _manifest()
+
+
+def test_retriever_follows_a_reindex_with_another_model(repo, monkeypatch):
+    from datetime import timedelta
+    from adept.core import retrieval
+
+    loaded = []
+
+    def load_embedder(spec=None):
+        loaded.append(spec["model"])
+        return FakeEmbedder()
+
+    monkeypatch.setattr(retrieval, "load_embedder", load_embedder)
+    _create("--model", "first")
+    retriever = retrieval.open_retriever(index.DB_PATH, lazy=True, read_consistency_interval=timedelta(0))
+    retriever.search("return", mode="vector")
+    retriever.search("return", mode="vector")
+    assert loaded == ["first"]
+
+    _create("--model", "second", "--full")
+    retriever.search("return", mode="vector")
+    assert loaded == ["first", "second"]
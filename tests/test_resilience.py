@@ -0,0 +1,60 @@
+import httpx
+import pytest
+from adept.core import resilience
+from adept.core.resilience import run_resilient
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(resilience.time, "sleep", lambda seconds: None)
+    resilience._breakers.clear()
+
+
+def _requests() -> list:
+    return [{"provider": "primary-test"}, {"provider": "backup-test"}]
+
+
+def _failing_primary(sent: list):
+    def send(request):
+        sent.append(request["provider"])
+        if request["provider"] == "primary-test":
+            raise httpx.ConnectError("down")
+        return request, "ok", []
+    return send
+
+
+def test_failover_moves_to_the_next_provider():
+    sent = []
+    served, text, _ = run_resilient(_requests(), _failing_primary(sent))
+
+    assert (served["provider"], text) == ("backup-test", "ok")
+    assert sent[-1] == "backup-test"
+
+
+def test_without_failover_other_providers_are_not_tried():
+    sent = []
+    with pytest.raises(httpx.ConnectError):
+        run_resilient(_requests(), _failing_primary(sent), hedge=True, failover=False)
+
+    assert set(sent) == {"primary-test"}
+
+
+def test_latency_samples_carry_over_to_a_new_run(monkeypatch):
+    tracker = resilience.get_latency_tracker("primary-test")
+    for seconds in range(1, 21):
+        tracker.record(seconds / 10)
+
+    # A fresh process: no trackers and no open store.
+    monkeypatch.setattr(resilience, "_latencies", {})
+    monkeypatch.setattr(resilience, "_latency_store", None)
+
+    assert resilience.get_latency_tracker("primary-test").p95(20) == 2.0
+    assert resilience.get_latency_tracker("backup-test").p95(1) is None
+
+
+def test_latency_store_keeps_only_the_window(tmp_path):
+    store = resilience.LatencyStore(str(tmp_path / "latency.sqlite"))
+    for seconds in range(5):
+        store.add("primary-test", float(seconds), keep=3)
+
+    assert store.load("primary-test", 10) == [2.0, 3.0, 4.0]
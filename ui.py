@@ -1,15 +1,26 @@
+import json
+import uuid
 import streamlit as st
 import httpx
 from adept.core.config import MODEL_CONFIG
 
 if "messages" not in st.session_state:
     st.session_state.messages = []
-if "backend_history" not in st.session_state:
-    st.session_state.backend_history = []
+if "session_id" not in st.session_state:
+    # The API keeps the conversation server-side under this id.
+    st.session_state.session_id = uuid.uuid4().hex
 
 st.set_page_config(page_title="Adept", page_icon="🚀", layout="wide")
 
 API_URL = "http://127.0.0.1:8000/chat"
+STREAM_URL = f"{API_URL}/stream"
+SESSIONS_URL = "http://127.0.0.1:8000/sessions"
+
+
+@st.cache_resource
+def get_api_client() -> httpx.Client:
+    """One keep-alive client per Streamlit server instead of a new connection per message."""
+    return httpx.Client(timeout=60)
 
 st.title("🚀 Adept")
 st.caption("A multi-cloud, context-aware AI orchestrator.")
@@ -21,7 +32,11 @@ with st.sidebar:
     model = st.selectbox("AI Model", list(MODEL_CONFIG[provider]["models"].keys()))
     if st.button("Clear Conversation", use_container_width=True):
         st.session_state.messages = []
-        st.session_state.backend_history = []
+        try:
+            get_api_client().delete(f"{SESSIONS_URL}/{st.session_state.session_id}")
+        except httpx.HTTPError:
+            pass
+        st.session_state.session_id = uuid.uuid4().hex
         st.rerun()
 
 # Main chat interface
@@ -38,25 +53,39 @@ if prompt := st.chat_input("Ask Adept anything..."):
         message_placeholder = st.empty()
         message_placeholder.markdown("Thinking...")
         try:
-            with httpx.Client(timeout=60) as client:
-                response = client.post(
-                    API_URL,
-                    json={
-                        "message": prompt,
-                        "provider": provider,
-                        "model": model,
-                        "conversation_history": st.session_state.backend_history,
-                    }
-                )
+            full_response = ""
+            result = {}
+            event = None
+            with get_api_client().stream(
+                "POST",
+                STREAM_URL,
+                json={
+                    "message": prompt,
+                    "provider": provider,
+                    "model": model,
+                    "session_id": st.session_state.session_id,
+                }
+            ) as response:
                 response.raise_for_status()
-            
-            result = response.json()
-            
+                # Server-sent events: "event:" names the final done/error message, "data:" carries JSON.
+                for line in response.iter_lines():
+                    if line.startswith("event:"):
+                        event = line[len("event:"):].strip()
+                    elif line.startswith("data:"):
+                        data = json.loads(line[len("data:"):])
+                        if event is None:
+                            full_response += data.get("delta", "")
+                            message_placeholder.markdown(full_response + "▌")
+                        else:
+                            result = {"status": "error", **data} if event == "error" else data
+                            event = None
+
             if result.get("status") == "success":
-                full_response = result.get("response", "")
+                full_response = result.get("response", full_response)
                 message_placeholder.markdown(full_response)
+                if result.get("time_to_first_token") is not None:
+                    st.caption(f"Time to first token: {result['time_to_first_token']:.2f}s")
                 st.session_state.messages.append({"role": "assistant", "content": full_response})
-                st.session_state.backend_history = result.get("conversation_history", [])
             else:
                 st.error(f"API Error: {result.get('detail', 'Unknown error')}")
 